@@ -0,0 +1,124 @@
+"""
+Benchmarks for the caches in problem_1. Run from inside the problem_1 directory: `python benchmark_1.py`
+"""
+
+import itertools
+import random
+import threading
+import time
+import tracemalloc
+
+from problem_1 import CompactLRU_Cache, LRU_Cache, LRUPolicy, SLRUPolicy, ShardedLRU_Cache, TinyLFUPolicy, TwoQPolicy
+
+
+class LockedLRU_Cache(object):
+    """ Baseline: a single LRU_Cache behind one global lock """
+
+    def __init__(self, capacity):
+        self._cache = LRU_Cache(capacity)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache.set(key, value)
+
+
+def run_threads(cache, thread_count, operations_per_thread, key_space):
+    def worker(seed):
+        key = seed
+        for _ in range(operations_per_thread):
+            # cheap pseudo random key sequence so that random module doesn't dominate the timing
+            key = (key * 1103515245 + 12345) % key_space
+            if cache.get(key) == -1:
+                cache.set(key, key)
+
+    threads = [threading.Thread(target=worker, args=(n + 1,)) for n in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return thread_count * operations_per_thread / elapsed
+
+
+def benchmark_contention(capacity=10000, key_space=20000, total_operations=400000):
+    print("\n-------Contention benchmark (ops/sec)-----------")
+    print("{:>8} {:>16} {:>16}".format("threads", "locked LRU", "sharded LRU"))
+    for thread_count in (1, 4, 16):
+        operations_per_thread = total_operations // thread_count
+        locked = run_threads(LockedLRU_Cache(capacity), thread_count, operations_per_thread, key_space)
+        sharded = run_threads(ShardedLRU_Cache(capacity), thread_count, operations_per_thread, key_space)
+        print("{:>8} {:>16,.0f} {:>16,.0f}".format(thread_count, locked, sharded))
+
+
+def measure_bytes_per_entry(cache_class, entries):
+    # keys and values are created up front so only the memory used by the cache itself is measured
+    keys = list(range(entries))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache = cache_class(entries)
+    for key in keys:
+        cache.set(key, key)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / entries
+
+
+def benchmark_memory(entries=200000):
+    print("\n-------Memory benchmark ({:,} entries)-----------".format(entries))
+    print("{:>20} {:>16}".format("engine", "bytes/entry"))
+    for cache_class in (LRU_Cache, CompactLRU_Cache):
+        print("{:>20} {:>16.1f}".format(cache_class.__name__, measure_bytes_per_entry(cache_class, entries)))
+
+
+def zipf_trace(length, key_space, exponent=1.0, seed=42):
+    rng = random.Random(seed)
+    cumulative_weights = list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, key_space + 1)))
+    return rng.choices(range(key_space), cum_weights=cumulative_weights, k=length)
+
+
+def scan_trace(length, key_space, scan_length, scan_every, seed=42):
+    # zipf traffic on a hot key space, interrupted by sequential scans over keys that are never seen again
+    hot_trace = zipf_trace(length, key_space, seed=seed)
+    trace = []
+    next_cold_key = key_space
+    for position in range(0, length, scan_every):
+        trace.extend(hot_trace[position:position + scan_every])
+        trace.extend(range(next_cold_key, next_cold_key + scan_length))
+        next_cold_key += scan_length
+    return trace
+
+
+def replay(cache, trace):
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) == -1:
+            cache.set(key, key)
+        else:
+            hits += 1
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+def benchmark_policies(capacity=1000, length=200000, key_space=10000):
+    traces = [
+        ("zipf", zipf_trace(length, key_space)),
+        ("scan-heavy", scan_trace(length, key_space, scan_length=2 * capacity, scan_every=5000)),
+    ]
+    print("\n-------Eviction policy trace replay (capacity={:,})-----------".format(capacity))
+    print("{:>12} {:>16} {:>10} {:>14}".format("trace", "policy", "hit ratio", "ops/sec"))
+    for trace_name, trace in traces:
+        for policy in (LRUPolicy, SLRUPolicy, TwoQPolicy, TinyLFUPolicy):
+            hit_ratio, ops = replay(LRU_Cache(capacity, policy), trace)
+            print("{:>12} {:>16} {:>10.3f} {:>14,.0f}".format(trace_name, policy.__name__, hit_ratio, ops))
+
+
+benchmark_contention()
+benchmark_memory()
+benchmark_policies()
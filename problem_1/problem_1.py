@@ -24,18 +24,469 @@ you must write code that removes the least recently used entry first and then in
 All operations must take O(1) time.
 """
 
+from array import array
 from collections import OrderedDict
+from concurrent.futures import Future
+import asyncio
+import functools
+import heapq
+import inspect
+import mmap
+import os
+import pathlib
+import pickle
+import struct
+import tempfile
+import threading
+import time
 
+# marks a cache miss internally, -1 can't be used for that as it is a valid value to store
+_MISSING = object()
+
+
+class EvictionPolicy(object):
+    """
+    Base class of the eviction policies used by `LRU_Cache`. A policy owns the stored items and decides which item
+    is removed when the cache grows past its capacity. Subclasses implement `get`, `pop`, `evict`, `items`,
+    `__len__`, `__contains__` and the `_insert`/`_update` hooks used by `set`. All operations must be O(1).
+    """
 
-class LRU_Cache(object):
     def __init__(self, capacity):
-        # Initialize class variables
         self._capacity = capacity
+
+    def set(self, key, value):
+        """
+        Insert or update an item and evict items until the policy is back within capacity
+        Returns:
+            list: evicted (key, value) pairs
+        """
+        if key in self:
+            self._update(key, value)
+            return []
+
+        self._insert(key, value)
+        evicted = []
+        while len(self) > self._capacity:
+            evicted.append(self.evict())
+        return evicted
+
+
+class LRUPolicy(EvictionPolicy):
+    """ Plain least recently used eviction, default policy of `LRU_Cache` """
+
+    def __init__(self, capacity):
+        super().__init__(capacity)
         # pop, delete and append operations of OrderedDict are O(1) as it is a high performance Python container
         # inside it, it uses native Python Dictionary, HashMap and DoublyLinkedList
         # reference: https://docs.python.org/2/library/collections.html
         self._items = OrderedDict()
 
+    def get(self, key, default=None):
+        if key not in self._items:
+            return default
+        # now that item has been accessed we need to update its order so that it is considered as the most
+        # recently used item
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def _update(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+
+    def _insert(self, key, value):
+        self._items[key] = value
+
+    def evict(self):
+        # remove the least recently used item
+        return self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._items.pop(key, default)
+
+    def items(self):
+        # least recently used item first
+        return list(self._items.items())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __repr__(self):
+        return str(self._items)
+
+
+class SLRUPolicy(EvictionPolicy):
+    """
+    Segmented LRU: new items go to a probation segment and are promoted to a protected segment on their second
+    access. Items are always evicted from probation first, so a scan over cold keys (accessed only once) can never
+    push out the items in the protected segment.
+    """
+
+    def __init__(self, capacity, protected_ratio=0.8):
+        super().__init__(capacity)
+        self._protected_capacity = int(capacity * protected_ratio)
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+
+    def _promote(self, key, value):
+        self._protected[key] = value
+        if len(self._protected) > self._protected_capacity:
+            # protected segment is full, its least recently used item gets one more chance in probation
+            demoted_key, demoted_value = self._protected.popitem(last=False)
+            self._probation[demoted_key] = demoted_value
+
+    def get(self, key, default=None):
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return self._protected[key]
+        if key in self._probation:
+            value = self._probation.pop(key)
+            self._promote(key, value)
+            return value
+        return default
+
+    def _update(self, key, value):
+        if key in self._protected:
+            self._protected[key] = value
+            self._protected.move_to_end(key)
+        else:
+            del self._probation[key]
+            self._promote(key, value)
+
+    def _insert(self, key, value):
+        self._probation[key] = value
+
+    def victim(self):
+        # key that would be removed by the next call to evict()
+        return next(iter(self._probation if self._probation else self._protected))
+
+    def evict(self):
+        if self._probation:
+            return self._probation.popitem(last=False)
+        return self._protected.popitem(last=False)
+
+    def pop(self, key, default=None):
+        if key in self._protected:
+            return self._protected.pop(key)
+        return self._probation.pop(key, default)
+
+    def items(self):
+        return list(self._probation.items()) + list(self._protected.items())
+
+    def __len__(self):
+        return len(self._probation) + len(self._protected)
+
+    def __contains__(self, key):
+        return key in self._probation or key in self._protected
+
+    def __repr__(self):
+        return str(self.items())
+
+
+class TwoQPolicy(EvictionPolicy):
+    """
+    2Q (full version): new items enter a FIFO queue `A1in`. When they are evicted from it only their keys are
+    remembered in the ghost queue `A1out`. An item that is inserted again while its key is in `A1out` has proven to be
+    reused and goes to the main LRU queue `Am`. A scan therefore only cycles through `A1in`.
+
+    reference: Johnson & Shasha, "2Q: A Low Overhead High Performance Buffer Management Replacement Algorithm"
+    """
+
+    def __init__(self, capacity, in_ratio=0.25, out_ratio=0.5):
+        super().__init__(capacity)
+        self._in_capacity = max(1, int(capacity * in_ratio))
+        self._out_capacity = max(1, int(capacity * out_ratio))
+        self._in = OrderedDict()
+        self._out = OrderedDict()
+        self._main = OrderedDict()
+
+    def get(self, key, default=None):
+        if key in self._main:
+            self._main.move_to_end(key)
+            return self._main[key]
+        # items in A1in are not reordered on access, it is a FIFO queue
+        return self._in.get(key, default)
+
+    def _update(self, key, value):
+        if key in self._main:
+            self._main[key] = value
+            self._main.move_to_end(key)
+        else:
+            self._in[key] = value
+
+    def _insert(self, key, value):
+        if key in self._out:
+            del self._out[key]
+            self._main[key] = value
+        else:
+            self._in[key] = value
+
+    def evict(self):
+        if len(self._in) > self._in_capacity or not self._main:
+            key, value = self._in.popitem(last=False)
+            # remember only the key of the evicted item
+            self._out[key] = None
+            if len(self._out) > self._out_capacity:
+                self._out.popitem(last=False)
+            return key, value
+        return self._main.popitem(last=False)
+
+    def pop(self, key, default=None):
+        if key in self._main:
+            return self._main.pop(key)
+        return self._in.pop(key, default)
+
+    def items(self):
+        return list(self._in.items()) + list(self._main.items())
+
+    def __len__(self):
+        return len(self._in) + len(self._main)
+
+    def __contains__(self, key):
+        return key in self._in or key in self._main
+
+    def __repr__(self):
+        return str(self.items())
+
+
+class CountMinSketch(object):
+    """
+    Approximate frequency counter using `depth` rows of `width` small counters. Each key increments one counter per
+    row and its estimated frequency is the minimum of those counters. Counters are halved after every
+    `sample_size` increments so that old popularity fades away.
+    """
+    _MAX_COUNT = 15
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+    def __init__(self, width):
+        bits = max(8, (max(width, 1) - 1).bit_length())
+        self._shift = 64 - bits
+        self._tables = [bytearray(1 << bits) for _ in self._SEEDS]
+        self._sample_size = 10 * (1 << bits)
+        self._additions = 0
+
+    def increment(self, key):
+        # multiplicative hashing with a different odd seed per row, top bits of the product select the counter
+        key_hash = hash(key) & self._MASK_64
+        for table, seed in zip(self._tables, self._SEEDS):
+            index = ((key_hash * seed) & self._MASK_64) >> self._shift
+            if table[index] < self._MAX_COUNT:
+                table[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._reset()
+
+    def estimate(self, key):
+        key_hash = hash(key) & self._MASK_64
+        return min(table[((key_hash * seed) & self._MASK_64) >> self._shift]
+                   for table, seed in zip(self._tables, self._SEEDS))
+
+    def _reset(self):
+        # aging, O(width) once every `sample_size` increments so it is O(1) amortized
+        self._tables = [bytearray(count >> 1 for count in table) for table in self._tables]
+        self._additions //= 2
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """
+    W-TinyLFU: new items enter a small LRU window. An item leaving the window is admitted into the main segmented LRU
+    only if its estimated access frequency (count-min sketch) is higher than the frequency of the item the main
+    segment would evict, otherwise the candidate itself is evicted. One-hit wonders of a scan never get in.
+
+    reference: Einziger, Friedman & Manes, "TinyLFU: A Highly Efficient Cache Admission Policy"
+    """
+
+    def __init__(self, capacity, window_ratio=0.01):
+        super().__init__(capacity)
+        self._window_capacity = max(1, int(capacity * window_ratio))
+        self._main_capacity = max(0, capacity - self._window_capacity)
+        self._window = OrderedDict()
+        self._main = SLRUPolicy(self._main_capacity)
+        self._sketch = CountMinSketch(capacity)
+
+    def get(self, key, default=None):
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+            return self._window[key]
+        return self._main.get(key, default)
+
+    def set(self, key, value):
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window[key] = value
+            self._window.move_to_end(key)
+            return []
+        if key in self._main:
+            self._main._update(key, value)
+            return []
+
+        self._window[key] = value
+        if len(self._window) <= self._window_capacity:
+            return []
+
+        candidate = self._window.popitem(last=False)
+        if len(self._main) < self._main_capacity:
+            self._main._insert(*candidate)
+            return []
+        if self._main_capacity == 0:
+            return [candidate]
+
+        # admission filter: the more frequently used of candidate and victim stays in the cache
+        if self._sketch.estimate(candidate[0]) > self._sketch.estimate(self._main.victim()):
+            evicted = self._main.evict()
+            self._main._insert(*candidate)
+            return [evicted]
+        return [candidate]
+
+    def evict(self):
+        if self._main:
+            return self._main.evict()
+        return self._window.popitem(last=False)
+
+    def pop(self, key, default=None):
+        if key in self._window:
+            return self._window.pop(key)
+        return self._main.pop(key, default)
+
+    def items(self):
+        return self._main.items() + list(self._window.items())
+
+    def __len__(self):
+        return len(self._window) + len(self._main)
+
+    def __contains__(self, key):
+        return key in self._window or key in self._main
+
+    def __repr__(self):
+        return str(self.items())
+
+
+class TimerWheel(object):
+    """
+    Hashed timer wheel used for TTL expiry. Keys are put in a bucket per tick (`resolution` seconds) of their
+    deadline, so scheduling and cancelling are O(1) and finding expired keys never scans the whole cache. The ticks of
+    non-empty buckets are also kept in a heap, so the elapsed ones are visited in order without walking through the
+    empty ticks in between, even after a long idle period.
+    """
+
+    def __init__(self, resolution, now):
+        self._resolution = resolution
+        self._buckets = {}
+        # ticks of the buckets, a tick stays in the heap when its bucket is emptied by `cancel` and is skipped later
+        self._ticks = []
+        # every tick before the cursor has been visited
+        self._cursor = int(now // resolution)
+
+    def _tick(self, deadline):
+        # a deadline already behind the cursor goes to the cursor bucket so that it is still visited
+        return max(int(deadline // self._resolution), self._cursor)
+
+    def schedule(self, key, deadline):
+        tick = self._tick(deadline)
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = set()
+            heapq.heappush(self._ticks, tick)
+            if len(self._ticks) > 2 * len(self._buckets) + 64:
+                # too many ticks of cancelled buckets, rebuild the heap from the buckets
+                self._ticks = list(self._buckets)
+                heapq.heapify(self._ticks)
+        bucket.add(key)
+
+    def cancel(self, key, deadline):
+        tick = self._tick(deadline)
+        bucket = self._buckets.get(tick)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[tick]
+
+    def pop_expired(self, now, limit):
+        """
+        Remove and return at most `limit` keys whose tick has fully elapsed
+        """
+        now_tick = int(now // self._resolution)
+        expired = []
+        while self._ticks and self._ticks[0] < now_tick and len(expired) < limit:
+            tick = self._ticks[0]
+            bucket = self._buckets.get(tick)
+            self._cursor = max(self._cursor, tick)
+            while bucket and len(expired) < limit:
+                expired.append(bucket.pop())
+            if bucket:
+                # limit reached, continue from this bucket on next call
+                return expired
+            heapq.heappop(self._ticks)
+            self._buckets.pop(tick, None)
+        if len(expired) < limit:
+            # every elapsed tick has been visited
+            self._cursor = max(self._cursor, now_tick)
+        return expired
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+
+class CacheStats(object):
+    """ Counters of an `LRU_Cache`, `load_time` is the total time in seconds spent in loaders """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.load_time = 0.0
+
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return str(f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+                   f"loads={self.loads}, load_failures={self.load_failures}, load_time={self.load_time:.6f})")
+
+
+class LRU_Cache(object):
+    # number of expired entries reclaimed by every `set`, so expiry keeps up without a stop-the-world sweep
+    _SWEEP_BATCH = 4
+
+    def __init__(self, capacity, policy=None, default_ttl=None, ttl_resolution=1.0, clock=time.monotonic,
+                 weigher=None, max_weight=None):
+        """
+        Args:
+            capacity(int): maximum number of items in the cache
+            policy(callable): eviction policy class (or factory) called with the capacity, `LRUPolicy` by default.
+                Other options are `SLRUPolicy`, `TwoQPolicy` and `TinyLFUPolicy`, use functools.partial to tune them
+            default_ttl(float): time to live in seconds of items set without a ttl, None means items never expire
+            ttl_resolution(float): width in seconds of a timer wheel tick, expired items are swept once their tick ends
+            clock(callable): returns the current time in seconds
+            weigher(callable): returns the weight of a value (e.g. `len` for bytes), enables weighted capacity
+            max_weight(int): maximum total weight of the items in the cache (e.g. a byte budget)
+        """
+        # Initialize class variables
+        self._capacity = capacity
+        self._policy = (policy or LRUPolicy)(max(capacity, 0))
+        self._default_ttl = default_ttl
+        self._clock = clock
+        # key -> deadline, only for items that have a ttl
+        self._expires = {}
+        self._wheel = TimerWheel(ttl_resolution, clock())
+        self.stats = CacheStats()
+        # key -> Future of the load in progress, shared by concurrent callers of get_or_load/aget_or_load
+        self._loads = {}
+        self._async_loads = {}
+        self._load_lock = threading.Lock()
+        # key -> weight, only used when a weigher is provided
+        self._weigher = weigher
+        self._max_weight = float('inf') if max_weight is None else max_weight
+        self._weights = {}
+        self._total_weight = 0
+
     def get(self, key):
         # Retrieve item from provided key. Return -1 if nonexistent.
         if self._capacity == 0:
@@ -46,18 +497,423 @@ class LRU_Cache(object):
         if key is None:
             return -1
 
-        # can search for
-        item = self._items.get(key, -1)
+        value = self._lookup(key)
+        return -1 if value is _MISSING else value
 
-        if item == -1:
-            return item
+    def _lookup(self, key):
+        if self._expires:
+            # lazy expiry, an expired item is dropped as soon as it is accessed
+            deadline = self._expires.get(key)
+            if deadline is not None and deadline <= self._clock():
+                self._remove(key)
+                self.stats.misses += 1
+                return _MISSING
 
-        # now that item has been accessed we need to update its order so that it is considered as the most
-        # recently used item. For that we will delete it first and then add it back again
-        del self._items[key]
-        self.set(key, item)
+        # the policy marks the item as used (e.g. most recently used for LRU)
+        value = self._policy.get(key, _MISSING)
+        if value is _MISSING:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value of key, or call `loader()` and cache its result on a miss. Concurrent misses on the
+        same key (from different threads) share a single call to `loader`, the other callers wait for its result.
+        If loader raises, the error is raised to every waiting caller and nothing is cached.
+        Args:
+            key: cache key
+            loader(callable): computes the value, called without arguments
+        """
+        with self._load_lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            load = self._loads.get(key)
+            if load is not None:
+                waiting = True
+            else:
+                waiting = False
+                load = self._loads[key] = Future()
+
+        if waiting:
+            return load.result()
+
+        start = time.perf_counter()
+        try:
+            value = loader()
+        except BaseException as error:
+            with self._load_lock:
+                del self._loads[key]
+                self.stats.load_failures += 1
+            load.set_exception(error)
+            raise
+
+        with self._load_lock:
+            self.stats.loads += 1
+            self.stats.load_time += time.perf_counter() - start
+            self.set(key, value)
+            del self._loads[key]
+        load.set_result(value)
+        return value
+
+    async def aget_or_load(self, key, loader):
+        """
+        asyncio version of `get_or_load`, `loader` is a coroutine function. Concurrent misses on the same key share
+        a single in-flight call, cancelling any of the callers doesn't cancel the shared load.
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        load = self._async_loads.get(key)
+        if load is None:
+            load = self._async_loads[key] = asyncio.ensure_future(self._async_load(key, loader))
+        # every caller waits through a shield, the first one is not special
+        return await asyncio.shield(load)
+
+    async def _async_load(self, key, loader):
+        # runs as its own task, so cancelling any caller (the first one too) doesn't cancel the load of the others
+        start = time.perf_counter()
+        try:
+            value = await loader()
+        except BaseException:
+            self.stats.load_failures += 1
+            raise
+        finally:
+            del self._async_loads[key]
+
+        self.stats.loads += 1
+        self.stats.load_time += time.perf_counter() - start
+        self.set(key, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Set the value if the key is not present in the cache. If the cache is at capacity the policy removes an item.
+        Args:
+            ttl(float): time to live in seconds, `default_ttl` of the cache is used if not provided
+        """
+        self._set(key, value, self._default_ttl if ttl is None else ttl)
+
+    def _set(self, key, value, ttl):
+        # same as `set` with the ttl already resolved, None means the item never expires
+        if self._capacity == 0:
+            print("Can't perform operations on 0 capacity cache")
+            return
+
+        # edge case
+        if key is None:
+            # key can't be None
+            return
+
+        # sweep before the weight bookkeeping, the key itself may be expired and forgotten by the sweep
+        if self._expires:
+            self.expire(self._SWEEP_BATCH)
+            self._forget_expiry(key)
+
+        if self._weigher is not None:
+            weight = self._weigher(value)
+            if weight > self._max_weight:
+                print("Value is too large for this cache")
+                # the old value of the key must not be served anymore
+                if key in self._policy:
+                    self._remove(key)
+                return
+            self._total_weight += weight - self._weights.get(key, 0)
+            self._weights[key] = weight
+
+        if ttl is not None:
+            deadline = self._clock() + ttl
+            self._expires[key] = deadline
+            self._wheel.schedule(key, deadline)
+
+        for evicted_key, _ in self._policy.set(key, value):
+            self._forget(evicted_key)
+            self.stats.evictions += 1
+
+        # weighted capacity, evict as many items as needed to fit the new value. Each item is evicted at most once
+        # after being set, so this is O(1) amortized
+        while self._total_weight > self._max_weight:
+            evicted_key, _ = self._policy.evict()
+            self._forget(evicted_key)
+            self.stats.evictions += 1
+
+    def expire(self, limit=100):
+        """
+        Incremental sweeper, removes at most `limit` expired items
+        Returns:
+            int: number of removed items
+        """
+        expired = self._wheel.pop_expired(self._clock(), limit)
+        for key in expired:
+            self._forget(key)
+            self._policy.pop(key)
+        return len(expired)
+
+    def _forget_expiry(self, key):
+        deadline = self._expires.pop(key, None)
+        if deadline is not None:
+            self._wheel.cancel(key, deadline)
+
+    def _forget(self, key):
+        # drop the expiry and weight bookkeeping of a key that is no longer in the cache
+        self._forget_expiry(key)
+        if self._weights:
+            self._total_weight -= self._weights.pop(key, 0)
+
+    def _remove(self, key):
+        self._forget(key)
+        self._policy.pop(key)
+
+    # snapshot file: magic, format version and entry count, then one length prefixed pickled record per entry
+    _SNAPSHOT_MAGIC = b"LRUC"
+    _SNAPSHOT_HEADER = struct.Struct("<4sBQ")
+    _SNAPSHOT_RECORD_LENGTH = struct.Struct("<I")
+    _SNAPSHOT_VERSION = 1
+
+    def dump(self, path):
+        """
+        Write the cache content to a binary snapshot file, most recently used item first. The remaining ttl of each
+        item is saved too (the clock may be different after a restart). The file is replaced atomically.
+        Returns:
+            int: number of saved items
+        """
+        now = self._clock() if self._expires else None
+        records = []
+        for key, value in reversed(self._policy.items()):
+            deadline = self._expires.get(key)
+            if deadline is not None and deadline <= now:
+                continue
+            records.append((key, value, None if deadline is None else deadline - now))
+
+        temp_path = os.fspath(path) + ".tmp"
+        with open(temp_path, "wb") as snapshot:
+            snapshot.write(self._SNAPSHOT_HEADER.pack(self._SNAPSHOT_MAGIC, self._SNAPSHOT_VERSION, len(records)))
+            for record in records:
+                data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+                snapshot.write(self._SNAPSHOT_RECORD_LENGTH.pack(len(data)))
+                snapshot.write(data)
+        os.replace(temp_path, path)
+        return len(records)
+
+    def load(self, path):
+        """
+        Warm start the cache from a snapshot written by `dump`. The file is memory mapped and read sequentially, most
+        recently used items first, and reading stops as soon as the cache is full so only the items that fit are ever
+        unpickled. Items are then inserted least recently used first to restore their recency order.
+        Returns:
+            int: number of restored items
+        """
+        if self._capacity <= 0:
+            print("Can't perform operations on 0 capacity cache")
+            return 0
+
+        with open(path, "rb") as snapshot:
+            size = os.fstat(snapshot.fileno()).st_size
+            if size < self._SNAPSHOT_HEADER.size:
+                print("Invalid snapshot file!")
+                return 0
+            with mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                magic, version, count = self._SNAPSHOT_HEADER.unpack_from(buffer, 0)
+                if magic != self._SNAPSHOT_MAGIC or version != self._SNAPSHOT_VERSION:
+                    print("Invalid snapshot file!")
+                    return 0
+
+                records = []
+                offset = self._SNAPSHOT_HEADER.size
+                view = memoryview(buffer)
+                try:
+                    for _ in range(min(count, self._capacity)):
+                        (length,) = self._SNAPSHOT_RECORD_LENGTH.unpack_from(buffer, offset)
+                        offset += self._SNAPSHOT_RECORD_LENGTH.size
+                        if offset + length > size:
+                            raise EOFError("record cut")
+                        key, value, ttl = pickle.loads(view[offset:offset + length])
+                        records.append((key, value, ttl))
+                        offset += length
+                except (struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError,
+                        KeyError, TypeError, ValueError):
+                    # truncated or corrupted body, nothing is restored
+                    print("Invalid Data!")
+                    return 0
+                finally:
+                    # the view must be released before the mmap can be closed
+                    view.release()
+
+        # ttl None is an item that never expired, not one that takes `default_ttl`
+        for key, value, ttl in reversed(records):
+            self._set(key, value, ttl)
+        return len(records)
+
+    def weight(self):
+        # total weight of the items in the cache, 0 if no weigher is used
+        return self._total_weight
+
+    def __len__(self):
+        return len(self._policy)
+
+    def __repr__(self):
+        return repr(self._policy)
+
+
+# separator of positional and keyword arguments in the keys of `memoize`
+_KWARGS_MARK = object()
+
+
+def memoize(cache):
+    """
+    Decorator caching the results of a function in `cache` (an `LRU_Cache`) by its arguments. Works for plain and
+    async functions, concurrent calls with the same arguments share one computation. The cache is available as the
+    `cache` attribute of the decorated function.
+
+    Example:
+        @memoize(LRU_Cache(128))
+        def fetch(user_id):
+            ...
+    """
+    def decorator(func):
+        def make_key(args, kwargs):
+            # the separator can't be an argument, so positional and keyword calls never get the same key
+            return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await cache.aget_or_load(make_key(args, kwargs), lambda: func(*args, **kwargs))
+            async_wrapper.cache = cache
+            return async_wrapper
 
-        return item
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_load(make_key(args, kwargs), lambda: func(*args, **kwargs))
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+class CompactLRU_Cache(object):
+    """
+    Memory compact LRU cache with the same get/set semantics as `LRU_Cache`.
+
+    Instead of one linked list node object per entry, all entries live in preallocated slots. Recency links are plain
+    integer slot indices stored in two `array`s (`_prev`, `_next`) and keys/values are stored in two lists indexed by
+    slot. Unused slots are chained into a free list through the `_next` array so that slots released by `_remove` are
+    reused before a new one is taken.
+
+    The key -> slot mapping is an open addressing hash table (linear probing) stored in an `array` of slot indices
+    rather than a dict, because a dict would need one boxed int object per entry just to hold the slot number, which
+    costs as much memory as the `OrderedDict` link node we are trying to get rid of.
+    """
+    _NIL = -1
+
+    def __init__(self, capacity):
+        self._capacity = capacity
+        size = max(capacity, 0)
+        self._keys = [None] * size
+        self._values = [None] * size
+        # hash of the key stored in each slot, so probing and rehashing never have to call hash() again
+        self._hashes = array('q', [0]) * size
+        self._prev = array('i', [self._NIL]) * size
+        # initially every slot is free, each free slot points to the next one
+        self._next = array('i', range(1, size + 1))
+        if size:
+            self._next[size - 1] = self._NIL
+        self._free = 0 if size else self._NIL
+        # index table is kept at most half full so that probe sequences stay short
+        table_size = 1
+        while table_size < 2 * size:
+            table_size *= 2
+        self._index = array('i', [self._NIL]) * table_size
+        self._mask = table_size - 1
+        self._size = 0
+        # head is the most recently used slot and tail the least recently used one
+        self._head = self._NIL
+        self._tail = self._NIL
+
+    def _find(self, key, key_hash):
+        # returns (position in index table, slot), slot is _NIL and position is the first empty position if not found
+        position = key_hash & self._mask
+        while True:
+            slot = self._index[position]
+            if slot == self._NIL:
+                return position, slot
+            if self._hashes[slot] == key_hash:
+                stored_key = self._keys[slot]
+                if stored_key is key or stored_key == key:
+                    return position, slot
+            position = (position + 1) & self._mask
+
+    def _delete_position(self, position):
+        # backward shift deletion: move following entries of the probe sequence into the hole, so no tombstones are
+        # needed and lookups never slow down over time
+        index, mask = self._index, self._mask
+        index[position] = self._NIL
+        next_position = (position + 1) & mask
+        while index[next_position] != self._NIL:
+            slot = index[next_position]
+            home = self._hashes[slot] & mask
+            # the entry can fill the hole only if the hole lies between its home position and its current position
+            if (next_position - home) & mask >= (next_position - position) & mask:
+                index[position] = slot
+                index[next_position] = self._NIL
+                position = next_position
+            next_position = (next_position + 1) & mask
+
+    def _unlink(self, slot):
+        prev_slot, next_slot = self._prev[slot], self._next[slot]
+        if prev_slot == self._NIL:
+            self._head = next_slot
+        else:
+            self._next[prev_slot] = next_slot
+        if next_slot == self._NIL:
+            self._tail = prev_slot
+        else:
+            self._prev[next_slot] = prev_slot
+
+    def _push_front(self, slot):
+        self._prev[slot] = self._NIL
+        self._next[slot] = self._head
+        if self._head != self._NIL:
+            self._prev[self._head] = slot
+        self._head = slot
+        if self._tail == self._NIL:
+            self._tail = slot
+
+    def _remove(self, key):
+        # remove the key and put its slot back in the free list, return False if the key is not present
+        position, slot = self._find(key, hash(key))
+        if slot == self._NIL:
+            return False
+        self._delete_position(position)
+        self._unlink(slot)
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._next[slot] = self._free
+        self._free = slot
+        self._size -= 1
+        return True
+
+    def get(self, key):
+        # Retrieve item from provided key. Return -1 if nonexistent.
+        if self._capacity == 0:
+            print("Can't perform operations on 0 capacity cache")
+            return -1
+
+        # edge case
+        if key is None:
+            return -1
+
+        _, slot = self._find(key, hash(key))
+        if slot == self._NIL:
+            return -1
+
+        # mark as most recently used
+        if slot != self._head:
+            self._unlink(slot)
+            self._push_front(slot)
+        return self._values[slot]
 
     def set(self, key, value):
         # Set the value if the key is not present in the cache. If the cache is at capacity remove the oldest item.
@@ -70,15 +926,88 @@ class LRU_Cache(object):
             # key can't be None
             return
 
-        # check for capacity full
-        if len(self._items) == self._capacity:
-            # remove the least recently used item
-            self._items.popitem(False)
+        key_hash = hash(key)
+        position, slot = self._find(key, key_hash)
+        if slot != self._NIL:
+            # existing key, update value and mark as most recently used
+            self._values[slot] = value
+            if slot != self._head:
+                self._unlink(slot)
+                self._push_front(slot)
+            return
+
+        if self._free == self._NIL:
+            # no free slot left, remove the least recently used item to release its slot
+            self._remove(self._keys[self._tail])
+            # removal may have shifted entries in the index table, look for the empty position again
+            position, _ = self._find(key, key_hash)
 
-        self._items[key] = value
+        slot = self._free
+        self._free = self._next[slot]
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._hashes[slot] = key_hash
+        self._index[position] = slot
+        self._size += 1
+        self._push_front(slot)
+
+    def __len__(self):
+        return self._size
 
     def __repr__(self):
-        return str(self._items)
+        items = []
+        slot = self._tail
+        while slot != self._NIL:
+            items.append((self._keys[slot], self._values[slot]))
+            slot = self._prev[slot]
+        return str(items)
+
+
+class ShardedLRU_Cache(object):
+    """
+    Thread-safe LRU cache made of `shards` independent `LRU_Cache` instances. Each key is hashed to exactly one shard
+    and every shard is guarded by its own lock, so threads working on different shards never wait for each other.
+    The total capacity is split between the shards, so eviction is LRU per shard (approximate LRU overall).
+    """
+
+    def __init__(self, capacity, shards=16, **cache_options):
+        """
+        Args:
+            capacity(int): total capacity, split between the shards
+            shards(int): number of independent shards
+            cache_options: forwarded to every `LRU_Cache` shard (policy, default_ttl, ...)
+        """
+        self._capacity = capacity
+        # never create more shards than entries, otherwise some shards would have 0 capacity
+        shards = max(1, min(shards, capacity))
+        self._shards = []
+        self._locks = []
+        for i in range(shards):
+            # distribute the remainder of the division among the first shards
+            shard_capacity = capacity // shards + (1 if i < capacity % shards else 0)
+            self._shards.append(LRU_Cache(shard_capacity, **cache_options))
+            self._locks.append(threading.Lock())
+
+    def _shard_index(self, key):
+        return hash(key) % len(self._shards)
+
+    def get(self, key):
+        # Retrieve item from provided key. Return -1 if nonexistent.
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self._shards[index].get(key)
+
+    def set(self, key, value, ttl=None):
+        # Set the value in the shard owning the key, that shard evicts its own least recently used item if full.
+        index = self._shard_index(key)
+        with self._locks[index]:
+            self._shards[index].set(key, value, ttl)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def __repr__(self):
+        return str(self._shards)
 
 
 def assert_(expected, actual):
@@ -136,7 +1065,471 @@ def test_cases():
     assert (output is -1)
 
 
+def test_sharded_cache():
+    sharded_cache = ShardedLRU_Cache(8, shards=4)
+    for i in range(8):
+        sharded_cache.set(i, i * 10)
+
+    output = sharded_cache.get(3)  # returns 30
+    assert_(30, output)
+
+    output = sharded_cache.get(42)  # returns -1 because 42 was never added
+    assert_(-1, output)
+
+    # capacity is split between shards so total number of items never exceeds capacity
+    for i in range(100):
+        sharded_cache.set(i, i)
+    assert_(8, len(sharded_cache))
+
+    # the most recently added key is always present in its shard
+    output = sharded_cache.get(99)  # returns 99
+    assert_(99, output)
+
+    # concurrent access from multiple threads
+    def worker(offset):
+        for i in range(1000):
+            sharded_cache.set(offset + i, i)
+            sharded_cache.get(offset + i)
+
+    threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert_(8, len(sharded_cache))
+
+    # edge cases
+    sharded_cache.set(None, 1)
+    output = sharded_cache.get(None)  # should return -1
+    assert_(-1, output)
+
+    # capacity smaller than shard count falls back to one shard per entry
+    small_cache = ShardedLRU_Cache(2, shards=16)
+    assert_(2, len(small_cache._shards))
+
+    # 0 capacity cache
+    zero_capacity_cache = ShardedLRU_Cache(0)
+    zero_capacity_cache.set(1, 10)  # should print warning message
+    output = zero_capacity_cache.get(1)  # should print warning message and return -1
+    assert_(-1, output)
+
+
+def test_compact_cache():
+    compact_cache = CompactLRU_Cache(3)
+    compact_cache.set(1, 1)
+    compact_cache.set(2, 2)
+    compact_cache.set(3, 3)
+
+    output = compact_cache.get(1)  # returns 1, 1 is now the most recently used item
+    assert_(1, output)
+
+    compact_cache.set(4, 4)  # evicts 2 as it is the least recently used item
+    output = compact_cache.get(2)  # returns -1
+    assert_(-1, output)
+    print(compact_cache)  # should print [(3, 3), (1, 1), (4, 4)]
+    assert_("[(3, 3), (1, 1), (4, 4)]", repr(compact_cache))
+
+    # update the value of an existing key
+    compact_cache.set(3, 30)
+    output = compact_cache.get(3)  # returns 30
+    assert_(30, output)
+    assert_(3, len(compact_cache))
+
+    # removed slots go to the free list and are reused
+    compact_cache._remove(1)
+    assert_(2, len(compact_cache))
+    compact_cache.set(5, 5)
+    assert_(3, len(compact_cache))
+    assert_(-1, compact_cache.get(1))
+    assert_(5, compact_cache.get(5))
+
+    # both implementations must behave exactly the same, keys are multiples of 32 so that they collide in the index
+    reference_cache = LRU_Cache(16)
+    compact_cache = CompactLRU_Cache(16)
+    key = 7
+    for _ in range(2000):
+        key = (key * 31 + 11) % 50 * 32
+        assert (reference_cache.get(key) == compact_cache.get(key))
+        reference_cache.set(key, key * 2)
+        compact_cache.set(key, key * 2)
+
+    # edge cases
+    compact_cache.set(None, None)
+    output = compact_cache.get(None)  # should return -1
+    assert_(-1, output)
+
+    # 0 capacity cache
+    zero_capacity_cache = CompactLRU_Cache(0)
+    zero_capacity_cache.set(1, 10)  # should print warning message
+    output = zero_capacity_cache.get(1)  # should print warning message and return -1
+    assert_(-1, output)
+
+
+def test_eviction_policies():
+    # a hot set of keys used twice, followed by a scan over cold keys used once
+    def hot_then_scan(cache):
+        for key in list(range(4)) * 2 + list(range(100, 120)):
+            if cache.get(key) == -1:
+                cache.set(key, key)
+        return [key for key in range(4) if cache.get(key) != -1]
+
+    # plain LRU loses the whole hot set
+    output = hot_then_scan(LRU_Cache(8))
+    assert_([], output)
+
+    # scan resistant policies keep it
+    output = hot_then_scan(LRU_Cache(8, SLRUPolicy))
+    assert_([0, 1, 2, 3], output)
+
+    output = hot_then_scan(LRU_Cache(8, TinyLFUPolicy))
+    assert_([0, 1, 2, 3], output)
+
+    # 2Q needs the hot keys to come back after leaving A1in before they are protected in Am
+    two_q_cache = LRU_Cache(8, TwoQPolicy)
+    for key in range(4):
+        two_q_cache.set(key, key)
+    for key in range(10, 18):
+        two_q_cache.set(key, key)  # pushes the first keys out of A1in
+    for key in range(4):
+        two_q_cache.set(key, key)  # keys are remembered in A1out so they go straight to Am
+    for key in range(100, 120):
+        two_q_cache.set(key, key)
+    output = [key for key in range(4) if two_q_cache.get(key) != -1]
+    assert_([0, 1, 2, 3], output)
+
+    # every policy respects capacity, keeps get/set semantics and updates values of existing keys
+    for policy in (LRUPolicy, SLRUPolicy, TwoQPolicy, TinyLFUPolicy):
+        cache = LRU_Cache(5, policy)
+        for key in range(50):
+            cache.set(key, key)
+            cache.get(key // 2)
+        assert (len(cache) == 5)
+        cache.set("hello", -8)
+        assert (cache.get("hello") in (-8, -1))  # TinyLFU may reject a brand new key
+        cache.set(49, 490)
+        assert (cache.get(49) in (490, -1))
+        assert (cache.get(None) == -1)
+
+    # capacity 1 edge case
+    for policy in (LRUPolicy, SLRUPolicy, TwoQPolicy, TinyLFUPolicy):
+        cache = LRU_Cache(1, policy)
+        cache.set(1, 1)
+        cache.set(2, 2)
+        assert (len(cache) == 1)
+
+
+def test_ttl():
+    class FakeClock(object):
+        def __init__(self):
+            self.now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    clock = FakeClock()
+    ttl_cache = LRU_Cache(10, default_ttl=10, clock=clock)
+    ttl_cache.set(1, 1)  # expires at 10 (default ttl)
+    ttl_cache.set(2, 2, ttl=5)  # expires at 5
+    ttl_cache.set(3, 3, ttl=100)  # expires at 100
+
+    clock.now = 4
+    output = ttl_cache.get(2)  # returns 2, still fresh
+    assert_(2, output)
+
+    clock.now = 5
+    output = ttl_cache.get(2)  # returns -1, expired and dropped lazily
+    assert_(-1, output)
+    assert_(2, len(ttl_cache))
+
+    # setting an existing key again resets its ttl
+    clock.now = 8
+    ttl_cache.set(1, 10, ttl=20)  # now expires at 28
+    clock.now = 20
+    output = ttl_cache.get(1)  # returns 10
+    assert_(10, output)
+
+    # sweeper reclaims expired items without them being accessed
+    for key in range(100, 105):
+        ttl_cache.set(key, key, ttl=1)
+    clock.now = 25
+    output = ttl_cache.expire(limit=2)  # bounded, removes only 2 out of 5 expired items
+    assert_(2, output)
+    output = ttl_cache.expire(limit=10)  # removes the other 3
+    assert_(3, output)
+    assert_(2, len(ttl_cache))
+
+    # evicted items are removed from expiry bookkeeping too
+    small_cache = LRU_Cache(2, default_ttl=1, clock=clock)
+    for key in range(5):
+        small_cache.set(key, key)
+    assert_(2, len(small_cache._expires))
+    assert_(2, len(small_cache._wheel))
+
+    # long idle period, sweeper jumps straight to the pending buckets
+    clock.now = 1000000
+    output = small_cache.expire()
+    assert_(2, output)
+    assert_(0, len(small_cache))
+
+    # sparse elapsed ticks are visited in order, in bounded batches, and cancelled buckets are skipped
+    wheel = TimerWheel(1.0, 0)
+    for key in range(100):
+        wheel.schedule(key, key * 1000)
+    wheel.cancel(1, 1000)
+    assert_([0, 2, 3], wheel.pop_expired(10 ** 6, 3))
+    assert_(list(range(4, 100)), [key for _ in range(96) for key in wheel.pop_expired(10 ** 6, 1)])
+    assert_([], wheel.pop_expired(10 ** 6, 10))
+    wheel.schedule("late", 5)  # deadline behind the cursor, expires on next call
+    assert_(["late"], wheel.pop_expired(10 ** 6 + 1, 10))
+
+    # items without ttl never expire
+    no_ttl_cache = LRU_Cache(2, clock=clock)
+    no_ttl_cache.set(1, 1)
+    clock.now = 2000000
+    output = no_ttl_cache.get(1)  # returns 1
+    assert_(1, output)
+
+
+def test_loading():
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    loading_cache = LRU_Cache(2)
+
+    # concurrent misses on the same key share one load
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(loading_cache.get_or_load("key", slow_loader)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert_(["value"] * 10, results)
+    assert_(1, len(calls))
+    assert_(1, loading_cache.stats.loads)
+    assert (loading_cache.stats.load_time > 0)
+
+    # next call is a hit
+    output = loading_cache.get_or_load("key", slow_loader)
+    assert_("value", output)
+    assert_(1, len(calls))
+
+    # loader errors are raised and nothing is cached
+    def failing_loader():
+        raise ValueError("backend down")
+
+    try:
+        loading_cache.get_or_load("bad", failing_loader)
+        assert False, "error should be raised"
+    except ValueError:
+        pass
+    assert_(-1, loading_cache.get("bad"))
+    assert_(1, loading_cache.stats.load_failures)
+
+    # evictions are counted
+    loading_cache.set(1, 1)
+    loading_cache.set(2, 2)
+    assert_(1, loading_cache.stats.evictions)
+    print(loading_cache.stats)
+
+    # asyncio version
+    async_calls = []
+
+    async def async_loader():
+        async_calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run_async():
+        async_cache = LRU_Cache(2)
+        results = await asyncio.gather(*[async_cache.aget_or_load("key", async_loader) for _ in range(10)])
+        assert_([42] * 10, results)
+        assert_(1, len(async_calls))
+
+        async def failing_async_loader():
+            raise ValueError("backend down")
+
+        try:
+            await async_cache.aget_or_load("bad", failing_async_loader)
+            assert False, "error should be raised"
+        except ValueError:
+            pass
+        assert_(1, async_cache.stats.load_failures)
+
+        # the first caller is cancelled, the load goes on for the other callers
+        first = asyncio.ensure_future(async_cache.aget_or_load("shared", async_loader))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(async_cache.aget_or_load("shared", async_loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert_(42, await second)
+        assert (first.cancelled())
+        assert_(42, async_cache.get("shared"))
+
+    asyncio.run(run_async())
+
+    # decorator on sync and async functions
+    @memoize(LRU_Cache(10))
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert_(16, square(4))
+    assert_(16, square(4))
+    assert_(2, len(calls))  # computed only once
+    assert_(1, square.cache.stats.hits)
+
+    @memoize(LRU_Cache(10))
+    async def async_square(x, power=2):
+        return x ** power
+
+    output = asyncio.run(async_square(3, power=3))
+    assert_(27, output)
+
+    # positional and keyword calls don't share keys
+    @memoize(LRU_Cache(10))
+    def arguments(*args, **kwargs):
+        return args, kwargs
+
+    assert_(((1,), {"a": 2}), arguments(1, a=2))
+    argument = ((1,), (("a", 2),))
+    assert_(((argument,), {}), arguments(argument))
+
+
+def test_weighted_capacity():
+    # byte budget of 10 with values weighted by their length
+    weighted_cache = LRU_Cache(100, weigher=len, max_weight=10)
+    weighted_cache.set(1, b"aaaa")
+    weighted_cache.set(2, b"bbbb")
+    assert_(8, weighted_cache.weight())
+
+    # needs 7 bytes, both least recently used items are evicted to fit
+    weighted_cache.set(3, b"ccccccc")
+    assert_(-1, weighted_cache.get(1))
+    assert_(-1, weighted_cache.get(2))
+    assert_(b"ccccccc", weighted_cache.get(3))
+    assert_(7, weighted_cache.weight())
+
+    weighted_cache.set(4, b"dd")
+    output = weighted_cache.get(3)  # 3 becomes the most recently used item
+    assert_(b"ccccccc", output)
+    weighted_cache.set(5, b"eee")  # evicts 4 only
+    assert_(-1, weighted_cache.get(4))
+    assert_(10, weighted_cache.weight())
+
+    # updating a key replaces its weight
+    weighted_cache.set(5, b"e")
+    assert_(8, weighted_cache.weight())
+
+    # oversize values are rejected and the old value of the key is dropped
+    weighted_cache.set(5, b"x" * 11)  # should print "Value is too large for this cache"
+    assert_(-1, weighted_cache.get(5))
+    assert_(7, weighted_cache.weight())
+    assert_(1, len(weighted_cache))
+
+    # count capacity still applies
+    count_cache = LRU_Cache(2, weigher=len, max_weight=100)
+    for key in range(5):
+        count_cache.set(key, b"a")
+    assert_(2, len(count_cache))
+    assert_(2, count_cache.weight())
+
+    # expired items release their weight
+    clock_time = [0]
+    ttl_cache = LRU_Cache(10, weigher=len, max_weight=100, default_ttl=1, clock=lambda: clock_time[0])
+    ttl_cache.set(1, b"abc")
+    clock_time[0] = 5
+    ttl_cache.expire()
+    assert_(0, ttl_cache.weight())
+
+    # setting an expired key again keeps the weight of its new value
+    clock_time[0] = 0
+    expired_cache = LRU_Cache(10, weigher=len, max_weight=10, clock=lambda: clock_time[0])
+    expired_cache.set("k", b"a", ttl=1)
+    clock_time[0] = 5
+    expired_cache.set("k", b"k" * 8)
+    expired_cache.set("x", b"x" * 8)  # evicts "k" to fit
+    assert_(-1, expired_cache.get("k"))
+    assert_(b"x" * 8, expired_cache.get("x"))
+    assert_(8, expired_cache.weight())
+
+
+def test_snapshot():
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "cache.snapshot")
+        cache = LRU_Cache(5)
+        for key in range(5):
+            cache.set(key, str(key) * 3)
+        cache.get(0)  # 0 becomes the most recently used item
+
+        output = cache.dump(snapshot_path)
+        assert_(5, output)
+
+        # load everything back in the same recency order
+        restored_cache = LRU_Cache(5)
+        output = restored_cache.load(snapshot_path)
+        assert_(5, output)
+        assert_(repr(cache), repr(restored_cache))
+
+        # smaller cache keeps only the most recently used items
+        small_cache = LRU_Cache(2)
+        output = small_cache.load(snapshot_path)
+        assert_(2, output)
+        print(small_cache)  # should print OrderedDict([(4, '444'), (0, '000')])
+        assert_("OrderedDict([(4, '444'), (0, '000')])", repr(small_cache))
+
+        # remaining ttl is kept and expired items are not saved
+        clock_time = [0]
+        ttl_cache = LRU_Cache(5, clock=lambda: clock_time[0])
+        ttl_cache.set("short", 1, ttl=5)
+        ttl_cache.set("long", 2, ttl=50)
+        ttl_cache.set("forever", 3)
+        clock_time[0] = 10
+        output = ttl_cache.dump(snapshot_path)
+        assert_(2, output)
+        restored_cache = LRU_Cache(5, clock=lambda: clock_time[0])
+        restored_cache.load(snapshot_path)
+        assert_(-1, restored_cache.get("short"))
+        assert_(2, restored_cache.get("long"))
+        clock_time[0] = 50
+        assert_(-1, restored_cache.get("long"))  # 40 seconds were left at dump time
+        assert_(3, restored_cache.get("forever"))
+
+        # items without ttl don't take the default ttl of the restored cache, paths can be `pathlib.Path`
+        ttl_cache.dump(pathlib.Path(snapshot_path))
+        default_ttl_cache = LRU_Cache(5, default_ttl=1, clock=lambda: clock_time[0])
+        default_ttl_cache.load(pathlib.Path(snapshot_path))
+        clock_time[0] = 1000
+        assert_(3, default_ttl_cache.get("forever"))
+
+        # truncated or corrupted body, nothing is restored
+        with open(snapshot_path, "rb") as snapshot:
+            data = snapshot.read()
+        for corrupted in (data[:-3], data[:-3] + b"\xff\xff\xff", data[:LRU_Cache._SNAPSHOT_HEADER.size + 2]):
+            with open(snapshot_path, "wb") as snapshot:
+                snapshot.write(corrupted)
+            output = LRU_Cache(5).load(snapshot_path)  # should print "Invalid Data!"
+            assert_(0, output)
+
+        # invalid snapshot
+        with open(snapshot_path, "wb") as snapshot:
+            snapshot.write(b"not a snapshot file")
+        output = LRU_Cache(5).load(snapshot_path)  # should print "Invalid snapshot file!"
+        assert_(0, output)
+
+
 test_cases()
+test_sharded_cache()
+test_compact_cache()
+test_eviction_policies()
+test_ttl()
+test_loading()
+test_weighted_capacity()
+test_snapshot()
 
 
 
@@ -0,0 +1,113 @@
+"""
+Benchmarks for the file finders in problem_2. Run from inside the problem_2 directory: `python benchmark_2.py`
+"""
+
+import os
+import tempfile
+import time
+
+from problem_2 import FileIndex, find_files, iter_files, iter_files_parallel
+
+
+def make_wide_tree(root, directories=200, files_per_directory=100):
+    for d in range(directories):
+        directory = os.path.join(root, "dir{}".format(d), "sub")
+        os.makedirs(directory)
+        for f in range(files_per_directory):
+            open(os.path.join(directory, "file{}.{}".format(f, "c" if f % 2 else "h")), "w").close()
+
+
+def make_deep_tree(root, depth=1500):
+    # deeper than the default recursion limit (1000)
+    directory = root
+    for _ in range(depth):
+        directory = os.path.join(directory, "d")
+        os.mkdir(directory)
+        open(os.path.join(directory, "f.c"), "w").close()
+
+
+def time_finder(name, finder):
+    start = time.perf_counter()
+    try:
+        results = iter(finder())
+        first_result = next(results, None)
+        first_result_time = time.perf_counter() - start
+        count = (first_result is not None) + sum(1 for _ in results)
+    except RecursionError:
+        print("{:>12} failed with RecursionError".format(name))
+        return
+    total_time = time.perf_counter() - start
+    print("{:>12} {:>10,} files {:>10.3f}s total {:>10.4f}s to first result".format(name, count, total_time,
+                                                                                    first_result_time))
+
+
+def remove_tree(root):
+    # shutil.rmtree is recursive too and fails on the deep tree, remove everything bottom up instead
+    directories = [root]
+    for directory in directories:
+        for entry in os.scandir(directory):
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.path)
+            else:
+                os.remove(entry.path)
+    for directory in reversed(directories):
+        os.rmdir(directory)
+
+
+def benchmark_tree(title, make_tree):
+    root = tempfile.mkdtemp()
+    try:
+        make_tree(root)
+        print("\n-------{}-----------".format(title))
+        time_finder("find_files", lambda: find_files(".c", root))
+        time_finder("iter_files", lambda: iter_files(".c", root))
+    finally:
+        remove_tree(root)
+
+
+def benchmark_workers(worker_counts=(1, 2, 4, 8, 16)):
+    root = tempfile.mkdtemp()
+    try:
+        make_wide_tree(root, directories=1000, files_per_directory=20)
+        print("\n-------Parallel crawl (1000 directories x 20 files)-----------")
+        print("{:>8} {:>16}".format("workers", "files/sec"))
+        for workers in worker_counts:
+            start = time.perf_counter()
+            count = sum(1 for _ in iter_files_parallel("", root, workers=workers))
+            print("{:>8} {:>16,.0f}".format(workers, count / (time.perf_counter() - start)))
+    finally:
+        remove_tree(root)
+
+
+def benchmark_index(suffixes=(".c", ".h", "7.c", ".py")):
+    root = tempfile.mkdtemp()
+    try:
+        make_wide_tree(root, directories=1000, files_per_directory=50)
+        # a freshly written tree is always listed again by refresh (mtime safety window), pretend it is older
+        for directory, _, _ in os.walk(root):
+            os.utime(directory, ns=(0, 0))
+        print("\n-------Index (1000 directories x 50 files)-----------")
+        index = FileIndex(root)
+        start = time.perf_counter()
+        index.refresh()
+        print("{:>24} {:>10.4f}s".format("build", time.perf_counter() - start))
+        start = time.perf_counter()
+        index.refresh()
+        print("{:>24} {:>10.4f}s".format("refresh (no change)", time.perf_counter() - start))
+        for suffix in suffixes:
+            start = time.perf_counter()
+            walk_count = len(find_files(suffix, root))
+            walk_time = time.perf_counter() - start
+            start = time.perf_counter()
+            index_count = len(index.find(suffix))
+            index_time = time.perf_counter() - start
+            assert walk_count == index_count
+            print("{:>24} {:>10.4f}s walk {:>10.4f}s index".format("query " + suffix, walk_time, index_time))
+    finally:
+        remove_tree(root)
+
+
+benchmark_tree("Wide tree (200 directories x 100 files)", make_wide_tree)
+benchmark_tree("Deep tree (1500 levels)", make_deep_tree)
+benchmark_workers()
+benchmark_index()
@@ -1,4 +1,22 @@
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import errno
+import fnmatch
 import os
+import pickle
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, only used by the tests
+    resource = None
 
 
 def find_files(suffix, path):
@@ -39,6 +57,483 @@ def find_files(suffix, path):
     return output
 
 
+def iter_files(suffix, path):
+    """
+        Generator version of `find_files`, yields the paths of the files beneath path with file name suffix as soon as
+        they are found and in the same order as `find_files`.
+
+        It walks the tree iteratively with a stack of directory listings, so deep trees can't hit the recursion limit,
+        and uses the file type cached in each directory entry instead of calling `os.path.isfile` and
+        `os.path.isdir` (two extra `stat` calls) for every entry. Every directory is read in one go and closed before
+        going further, so only one directory handle is open at a time however deep the tree is. Directories that
+        can't be read are skipped, running out of file descriptors is an error.
+
+        Args:
+          suffix(str): suffix if the file name to be found
+          path(str): path of the file system
+
+        Yields:
+           str: path of a matching file
+    """
+
+    # check if path is valid and is a valid directory
+    if not isinstance(path, str) or not isinstance(suffix, str) or not os.path.isdir(path):
+        return
+
+    # entries of every directory on the current path, reversed so that the next entry is popped from the end
+    stack = [_read_entries(path)]
+    while stack:
+        if not stack[-1]:
+            # this directory is done, continue with its parent
+            stack.pop()
+            continue
+
+        entry = stack[-1].pop()
+        if entry.is_file():
+            if entry.path.endswith(suffix):
+                yield entry.path
+        elif entry.is_dir():
+            # descend right away to keep the same depth first order as find_files
+            try:
+                stack.append(_read_entries(entry.path))
+            except OSError as error:
+                if error.errno in (errno.EMFILE, errno.ENFILE):
+                    # not a directory that can't be read, results would be silently missing
+                    raise
+
+
+def _read_entries(directory):
+    # entries of a directory in reverse order, the directory handle is closed before returning
+    with os.scandir(directory) as entries:
+        return list(entries)[::-1]
+
+
+def _list_directory(directory, suffix):
+    # list one directory, returns the paths of the matching files and the paths of the subdirectories
+    matches = []
+    subdirectories = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file():
+                if entry.path.endswith(suffix):
+                    matches.append(entry.path)
+            elif entry.is_dir():
+                subdirectories.append(entry.path)
+    return matches, subdirectories
+
+
+def iter_files_parallel(suffix, path, workers=8, limit=None, cancel=None):
+    """
+        Parallel version of `iter_files` for filesystems where directory listings are slow blocking calls (network
+        storage, NVMe with deep queues). Directories are put in a shared work queue served by a pool of `workers`
+        threads, every thread lists one directory at a time and puts its subdirectories back in the queue. Matches
+        are streamed back to the caller as they are found, so their order is not deterministic.
+
+        Args:
+          suffix(str): suffix if the file name to be found
+          path(str): path of the file system
+          workers(int): number of threads listing directories
+          limit(int): stop after this many results, None for no limit
+          cancel(threading.Event): set it from another thread to stop the crawl early
+
+        Yields:
+           str: path of a matching file
+    """
+
+    # check if path is valid and is a valid directory
+    if not isinstance(path, str) or not isinstance(suffix, str) or not os.path.isdir(path):
+        return
+
+    directories = queue.Queue()
+    # batches of matches, one list per directory, `None` when the whole tree has been listed
+    results = queue.Queue()
+    # set to stop the workers, the caller's `cancel` event is only read, so it can be reused for another crawl
+    stop = threading.Event()
+    # number of directories queued or being listed, the crawl is over when it drops to 0
+    pending = [1]
+    pending_lock = threading.Lock()
+
+    def worker():
+        while True:
+            directory = directories.get()
+            if directory is None:
+                return
+            try:
+                # once stopped, remaining directories are only drained from the queue
+                if not stop.is_set() and not (cancel is not None and cancel.is_set()):
+                    matches, subdirectories = _list_directory(directory, suffix)
+                    if matches:
+                        results.put(matches)
+                    with pending_lock:
+                        pending[0] += len(subdirectories)
+                    for subdirectory in subdirectories:
+                        directories.put(subdirectory)
+            except OSError:
+                # directory can't be read, skip it
+                pass
+            finally:
+                with pending_lock:
+                    pending[0] -= 1
+                    finished = pending[0] == 0
+                if finished:
+                    results.put(None)
+                    for _ in range(workers):
+                        directories.put(None)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    directories.put(path)
+    for _ in range(workers):
+        executor.submit(worker)
+
+    count = 0
+    try:
+        while limit is None or count < limit:
+            matches = results.get()
+            if matches is None:
+                break
+            for match in matches:
+                yield match
+                count += 1
+                if count == limit:
+                    break
+    finally:
+        # limit reached, consumer stopped early or crawl finished: stop the workers and wait for them
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+async def afind_files(suffix, path, max_open=8, buffer_size=1024):
+    """
+        asyncio version of `iter_files`, use it as `async for path in afind_files(suffix, root)`.
+
+        Directory listings are blocking calls so they run in a thread pool of `max_open` threads, which also bounds
+        how many directories are open at the same time, and the event loop is never blocked. Matches go through a
+        queue of at most `buffer_size` paths: when the consumer is slower than the crawl the queue fills up and the
+        crawl waits, so paths are never buffered without limit. The order of the results is not deterministic.
+
+        Args:
+          suffix(str): suffix if the file name to be found
+          path(str): path of the file system
+          max_open(int): maximum number of directories listed (open) at the same time
+          buffer_size(int): maximum number of paths found but not consumed yet
+
+        Yields:
+           str: path of a matching file
+    """
+
+    # check if path is valid and is a valid directory
+    if not isinstance(path, str) or not isinstance(suffix, str) or not os.path.isdir(path):
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_open)
+    directories = asyncio.Queue()
+    results = asyncio.Queue(maxsize=buffer_size)
+    # put in results once every directory has been listed and all its matches are queued
+    done = object()
+
+    async def crawler():
+        while True:
+            directory = await directories.get()
+            try:
+                matches, subdirectories = await loop.run_in_executor(executor, _list_directory, directory, suffix)
+                for subdirectory in subdirectories:
+                    directories.put_nowait(subdirectory)
+                for match in matches:
+                    # waits while the buffer is full: backpressure from a slow consumer
+                    await results.put(match)
+            except OSError:
+                # directory can't be read, skip it
+                pass
+            finally:
+                directories.task_done()
+
+    async def finish():
+        await directories.join()
+        await results.put(done)
+
+    directories.put_nowait(path)
+    tasks = [asyncio.create_task(crawler()) for _ in range(max_open)]
+    tasks.append(asyncio.create_task(finish()))
+    try:
+        while True:
+            match = await results.get()
+            if match is done:
+                break
+            yield match
+    finally:
+        # crawl finished or consumer stopped early
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PatternMatcher(object):
+    """
+    Matches a file against many patterns at once, compiled a single time.
+
+    Plain suffixes (".c", "_test.py", ...) are matched against the full path, like `find_files`, through a trie of
+    the reversed suffixes: the path is read backwards one character at a time and every trie node on the way that
+    ends a suffix is a match, so the cost depends on the longest suffix and not on the number of patterns.
+    Glob patterns ("*.py", "test_?.c", ...) are matched against the file name. They are joined into one combined
+    regex used as a pre-filter, the individual regexes only run for names that match at least one glob.
+    """
+    _GLOB_CHARS = "*?["
+    # trie key under which the patterns ending at a node are stored, can't collide with a single character key
+    _PATTERNS = None
+
+    def __init__(self, patterns):
+        self._suffix_trie = {}
+        self._globs = []
+        for pattern in patterns:
+            if any(char in pattern for char in self._GLOB_CHARS):
+                self._globs.append((pattern, re.compile(fnmatch.translate(pattern))))
+            else:
+                node = self._suffix_trie
+                for char in reversed(pattern):
+                    node = node.setdefault(char, {})
+                node.setdefault(self._PATTERNS, []).append(pattern)
+        self._any_glob = compile_globs(pattern for pattern, _ in self._globs)
+
+    def match(self, path, name):
+        """
+        Returns:
+            list: patterns matched by the file at path, name is the file name
+        """
+        node = self._suffix_trie
+        matches = list(node.get(self._PATTERNS, ()))
+        for char in reversed(path):
+            node = node.get(char)
+            if node is None:
+                break
+            matches.extend(node.get(self._PATTERNS, ()))
+
+        if self._any_glob is not None and self._any_glob.match(name):
+            matches.extend(pattern for pattern, regex in self._globs if regex.match(name))
+        return matches
+
+
+def compile_globs(patterns):
+    """
+    Compile glob patterns into one regex matching a name if any of the patterns does, None if there are no patterns
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join("(?:{})".format(fnmatch.translate(pattern)) for pattern in patterns))
+
+
+def find_files_multi(patterns, path, exclude=(), max_depth=None, follow_symlinks=True):
+    """
+        Find the files beneath path matching any of many patterns in a single traversal.
+
+        Args:
+          patterns(iterable): file name suffixes (matched like `find_files`) and/or glob patterns like "*.py"
+          path(str): path of the file system
+          exclude(iterable or str): names or glob patterns of directories to skip, e.g. (".git", "node_modules").
+            Excluded directories are pruned before they are listed
+          max_depth(int): don't descend deeper than this many directories below path (0 means path only), None for
+            no limit
+          follow_symlinks(bool): descend into symbolic links to directories. Every directory is listed at most once
+            (tracked by device and inode), so symlink loops can't make the traversal run forever
+
+        Returns:
+           dict: pattern -> list of paths of the files matching it, a file can match several patterns
+    """
+
+    # check if path is valid and is a valid directory
+    if not isinstance(path, str) or isinstance(patterns, str) or not os.path.isdir(path):
+        return {}
+    patterns = [pattern for pattern in patterns if isinstance(pattern, str)]
+    results = {pattern: [] for pattern in patterns}
+    if not results:
+        return results
+
+    matcher = PatternMatcher(results)
+    # a single name is one pattern, not one pattern per character
+    if isinstance(exclude, str):
+        exclude = (exclude,)
+    excluded = compile_globs(pattern for pattern in exclude if isinstance(pattern, str))
+    visited = set()
+    stack = [(path, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            if follow_symlinks:
+                status = os.stat(directory)
+                directory_id = (status.st_dev, status.st_ino)
+                if directory_id in visited:
+                    # already listed, reached again through a symlink
+                    continue
+                visited.add(directory_id)
+
+            subdirectories = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        for pattern in matcher.match(entry.path, entry.name):
+                            results[pattern].append(entry.path)
+                    elif entry.is_dir(follow_symlinks=follow_symlinks):
+                        if max_depth is not None and depth >= max_depth:
+                            continue
+                        if excluded is not None and excluded.match(entry.name):
+                            continue
+                        subdirectories.append(entry.path)
+        except OSError:
+            # directory can't be read, skip it
+            continue
+        stack.extend((subdirectory, depth + 1) for subdirectory in reversed(subdirectories))
+
+    return results
+
+
+class FileIndex(object):
+    """
+    Persistent index of the files beneath a root directory for repeated `find_files` style queries.
+
+    For every directory the index keeps its mtime and its file and subdirectory names. `refresh` only lists the
+    directories whose mtime changed (a directory mtime changes when entries are added, removed or renamed in it), the
+    others just cost one `stat`. Queries never touch the filesystem: all file paths are kept in a sorted list for
+    prefix lookups and reversed in another sorted list for suffix lookups, both answered with binary search.
+    """
+    _VERSION = 1
+    # a directory modified this close to the scan may be modified again without its mtime changing
+    # (coarse filesystem timestamps), so it is listed again on next refresh
+    _MTIME_SAFETY_NS = 2 * 10 ** 9
+    _MAX_CHAR = chr(0x10FFFF)
+
+    def __init__(self, root):
+        self._root = root
+        # directory path -> (mtime in ns or None, file names, subdirectory names)
+        self._directories = {}
+        self._paths = []
+        self._reversed_paths = []
+
+    def refresh(self):
+        """
+        Bring the index up to date with the filesystem
+        Returns:
+            int: number of directories that had to be listed again
+        """
+        scan_start = time.time_ns()
+        old_directories = self._directories
+        directories = {}
+        relisted = 0
+        listed_directories = set()
+        stack = [self._root] if isinstance(self._root, str) else []
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = old_directories.get(directory)
+            if cached is not None and cached[0] == mtime:
+                _, files, subdirectories = cached
+            else:
+                try:
+                    files, subdirectories = self._list(directory)
+                except OSError:
+                    continue
+                relisted += 1
+                listed_directories.add(directory)
+                if mtime >= scan_start - self._MTIME_SAFETY_NS:
+                    mtime = None
+
+            directories[directory] = (mtime, files, subdirectories)
+            stack.extend(os.path.join(directory, name) for name in reversed(subdirectories))
+
+        self._directories = directories
+        self._update_lookups(old_directories, listed_directories | (old_directories.keys() - directories.keys()))
+        return relisted
+
+    @staticmethod
+    def _list(directory):
+        files = []
+        subdirectories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append(entry.name)
+                elif entry.is_dir():
+                    subdirectories.append(entry.name)
+        return files, subdirectories
+
+    def _build_lookups(self):
+        paths = [os.path.join(directory, name)
+                 for directory, (_, files, _) in self._directories.items() for name in files]
+        self._paths = sorted(paths)
+        self._reversed_paths = sorted(path[::-1] for path in paths)
+
+    def _update_lookups(self, old_directories, changed_directories):
+        # only the files of the directories listed again or removed can change, the sorted lists are updated in place
+        removed, added = [], []
+        for directory in changed_directories:
+            old_files = set(old_directories[directory][1]) if directory in old_directories else set()
+            files = set(self._directories[directory][1]) if directory in self._directories else set()
+            removed.extend(os.path.join(directory, name) for name in old_files - files)
+            added.extend(os.path.join(directory, name) for name in files - old_files)
+        if 8 * (len(removed) + len(added)) > len(self._paths):
+            # many changes (e.g. first refresh), sorting everything again is cheaper than moving the lists every time
+            self._build_lookups()
+            return
+        for path in removed:
+            for sorted_strings, string in ((self._paths, path), (self._reversed_paths, path[::-1])):
+                position = bisect_left(sorted_strings, string)
+                if position < len(sorted_strings) and sorted_strings[position] == string:
+                    del sorted_strings[position]
+        for path in added:
+            insort(self._paths, path)
+            insort(self._reversed_paths, path[::-1])
+
+    @classmethod
+    def _prefix_range(cls, sorted_strings, prefix):
+        start = bisect_left(sorted_strings, prefix)
+        end = bisect_left(sorted_strings, prefix + cls._MAX_CHAR, start)
+        return sorted_strings[start:end]
+
+    def find(self, suffix):
+        """
+        Same result as `find_files(suffix, root)` at the time of the last refresh, sorted by path
+        """
+        if not isinstance(suffix, str):
+            return []
+        return sorted(path[::-1] for path in self._prefix_range(self._reversed_paths, suffix[::-1]))
+
+    def find_prefix(self, prefix):
+        """
+        Sorted paths of all indexed files starting with prefix, e.g. all files beneath a subdirectory
+        """
+        if not isinstance(prefix, str):
+            return []
+        return self._prefix_range(self._paths, prefix)
+
+    def save(self, path):
+        with open(path, "wb") as index_file:
+            pickle.dump({"version": self._VERSION, "root": self._root, "directories": self._directories},
+                        index_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index written by `save`, call `refresh` to pick up the changes made since then
+        """
+        with open(path, "rb") as index_file:
+            data = pickle.load(index_file)
+        if data.get("version") != cls._VERSION:
+            print("Invalid index file!")
+            return None
+        index = cls(data["root"])
+        index._directories = data["directories"]
+        index._build_lookups()
+        return index
+
+    def __len__(self):
+        return len(self._paths)
+
+
 def test_cases():
     files = find_files(".c", "./testdir")
     print(files) # should return ['./testdir/subdir3/subsubdir1/b.c', './testdir/t1.c', './testdir/subdir5/a.c', './testdir/subdir1/a.c']
@@ -64,4 +559,271 @@ def test_cases():
     files = find_files("", "testdir")  # should return all files, not adding assert because on Mac there are extra files (.DS_Store) so assert will fail even if code correct
     print(files)
 
-test_cases()
\ No newline at end of file
+
+def test_iter_files():
+    # same result and order as find_files
+    files = list(iter_files(".c", "./testdir"))
+    print(files)
+    assert (files == find_files(".c", "./testdir"))
+
+    files = list(iter_files(".h", "./testdir"))
+    print(files)
+    assert (sorted(files) == sorted(['./testdir/subdir3/subsubdir1/b.h', './testdir/t1.h', './testdir/subdir5/a.h',
+                                     './testdir/subdir1/a.h']))
+
+    # results are available before the whole tree is walked, stop after the first one
+    files = iter_files(".c", "./testdir")
+    first_file = next(files)
+    print(first_file)
+    assert (first_file.endswith(".c"))
+    files.close()
+
+    # tree deeper than the file descriptor limit, only one directory is open at a time
+    if resource is not None:
+        directory = tempfile.mkdtemp()
+        soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+        try:
+            deepest = directory
+            for level in range(300):
+                deepest = os.path.join(deepest, "d")
+                os.mkdir(deepest)
+                open(os.path.join(deepest, "f{}.c".format(level)), "w").close()
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(64, soft_limit), hard_limit))
+            files = list(iter_files(".c", directory))
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
+            shutil.rmtree(directory)
+        assert (len(files) == 300)
+
+    # edge cases
+    # invalid directory
+    files = list(iter_files(".c", "./abcd-ramz"))  # should return empty list
+    print(files)
+    assert (files == [])
+
+    # invalid suffix
+    files = list(iter_files(None, "./testdir"))  # should return empty list
+    print(files)
+    assert (files == [])
+
+    # None path
+    files = list(iter_files(None, None))  # should return empty list
+    print(files)
+    assert (files == [])
+
+
+def test_iter_files_parallel():
+    expected = sorted(find_files(".c", "./testdir"))
+    for workers in (1, 4):
+        files = sorted(iter_files_parallel(".c", "./testdir", workers=workers))
+        print(files)
+        assert (files == expected)
+
+    # result limit
+    files = list(iter_files_parallel("", "./testdir", limit=2))
+    print(files)
+    assert (len(files) == 2)
+
+    # cancellation from another thread, crawl stops and the generator finishes
+    cancel = threading.Event()
+    cancel.set()
+    files = list(iter_files_parallel(".c", "./testdir", cancel=cancel))
+    print(files)
+    assert (len(files) <= len(expected))
+
+    # a crawl that finishes normally leaves the caller's event unset, it can be reused
+    cancel = threading.Event()
+    assert (sorted(iter_files_parallel(".c", "./testdir", cancel=cancel)) == expected)
+    assert (not cancel.is_set())
+    assert (sorted(iter_files_parallel(".c", "./testdir", cancel=cancel)) == expected)
+
+    # edge cases
+    files = list(iter_files_parallel(".c", "./abcd-ramz"))  # should return empty list
+    print(files)
+    assert (files == [])
+
+    files = list(iter_files_parallel(None, None))  # should return empty list
+    print(files)
+    assert (files == [])
+
+
+def test_file_index():
+    index = FileIndex("./testdir")
+    index.refresh()
+    files = index.find(".c")
+    print(files)
+    assert (files == sorted(find_files(".c", "./testdir")))
+
+    files = index.find_prefix("./testdir/subdir3/")
+    print(files)  # should print ['./testdir/subdir3/subsubdir1/b.c', './testdir/subdir3/subsubdir1/b.h']
+    assert (files == ['./testdir/subdir3/subsubdir1/b.c', './testdir/subdir3/subsubdir1/b.h'])
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, "tree")
+        shutil.copytree("./testdir", root)
+        # pretend the tree was last modified long ago, so the mtimes can be trusted
+        for tree_directory, _, _ in os.walk(root):
+            os.utime(tree_directory, ns=(0, 0))
+
+        index = FileIndex(root)
+        index.refresh()
+        index_path = os.path.join(directory, "files.index")
+        index.save(index_path)
+
+        # saved index answers queries without walking the tree
+        index = FileIndex.load(index_path)
+        files = index.find(".h")
+        print(files)
+        assert (files == sorted(find_files(".h", root)))
+
+        # nothing changed, nothing is listed again
+        relisted = index.refresh()
+        print(relisted)
+        assert (relisted == 0)
+
+        # only the modified directory is listed again
+        open(os.path.join(root, "subdir5", "new.c"), "w").close()
+        relisted = index.refresh()
+        print(relisted)
+        assert (relisted == 1)
+        assert (index.find(".c") == sorted(find_files(".c", root)))
+        assert (index.find_prefix(root) == sorted(find_files("", root)))
+
+        # a removed file is removed from both sorted lists
+        os.remove(os.path.join(root, "subdir1", "a.c"))
+        index.refresh()
+        assert (index.find(".c") == sorted(find_files(".c", root)))
+        assert (index.find_prefix(root) == sorted(find_files("", root)))
+
+        # removed directories disappear from the index
+        shutil.rmtree(os.path.join(root, "subdir3"))
+        index.refresh()
+        assert (index.find(".c") == sorted(find_files(".c", root)))
+
+    # edge cases
+    index = FileIndex("./abcd-ramz")
+    index.refresh()
+    files = index.find(".c")  # should return empty list
+    print(files)
+    assert (files == [])
+
+    files = FileIndex(None).find(None)  # should return empty list
+    print(files)
+    assert (files == [])
+
+
+def test_find_files_multi():
+    results = find_files_multi([".c", ".h", "*.c", "a.*", ".py"], "./testdir")
+    print(results)
+    assert (sorted(results[".c"]) == sorted(find_files(".c", "./testdir")))
+    assert (sorted(results[".h"]) == sorted(find_files(".h", "./testdir")))
+    assert (sorted(results["*.c"]) == sorted(find_files(".c", "./testdir")))
+    assert (sorted(results["a.*"]) == ['./testdir/subdir1/a.c', './testdir/subdir1/a.h', './testdir/subdir5/a.c',
+                                       './testdir/subdir5/a.h'])
+    assert (results[".py"] == [])
+
+    # overlapping suffixes, a file matches all of them
+    results = find_files_multi(["1.c", ".c", "c"], "./testdir")
+    assert (results["1.c"] == ['./testdir/t1.c'])
+    assert (len(results[".c"]) == 4 and len(results["c"]) == 4)
+
+    # excluded directories are pruned
+    results = find_files_multi([".c"], "./testdir", exclude=["subdir3", "subdir[15]"])
+    print(results)
+    assert (results == {".c": ['./testdir/t1.c']})
+
+    # a single exclude pattern, "*.pyc" must not exclude everything
+    results = find_files_multi([".c"], "./testdir", exclude="subdir*")
+    assert (results == {".c": ['./testdir/t1.c']})
+    results = find_files_multi([".c"], "./testdir", exclude="*.pyc")
+    assert (len(results[".c"]) == 4)
+
+    # max depth
+    results = find_files_multi([".c"], "./testdir", max_depth=0)
+    assert (results == {".c": ['./testdir/t1.c']})
+    results = find_files_multi([".c"], "./testdir", max_depth=1)
+    assert (sorted(results[".c"]) == ['./testdir/subdir1/a.c', './testdir/subdir5/a.c', './testdir/t1.c'])
+
+    # symlink loop
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "a", "b"))
+        open(os.path.join(directory, "a", "b", "f.c"), "w").close()
+        os.symlink(os.path.join(directory, "a"), os.path.join(directory, "a", "b", "loop"))
+        results = find_files_multi([".c"], directory)
+        print(results)
+        assert (len(results[".c"]) == 1)
+        results = find_files_multi([".c"], directory, follow_symlinks=False)
+        assert (len(results[".c"]) == 1)
+
+    # edge cases
+    results = find_files_multi([".c"], "./abcd-ramz")  # should return empty dict
+    print(results)
+    assert (results == {})
+
+    results = find_files_multi(".c", "./testdir")  # a single string is not a collection of patterns
+    assert (results == {})
+
+    results = find_files_multi([], "./testdir")  # should return empty dict
+    assert (results == {})
+
+    results = find_files_multi([None], None)  # should return empty dict
+    assert (results == {})
+
+
+def test_afind_files():
+    async def collect(suffix, path, **options):
+        return [match async for match in afind_files(suffix, path, **options)]
+
+    files = asyncio.run(collect(".c", "./testdir"))
+    print(files)
+    assert (sorted(files) == sorted(find_files(".c", "./testdir")))
+
+    # tiny buffer and one open directory at a time still find everything
+    files = asyncio.run(collect("", "./testdir", max_open=1, buffer_size=1))
+    print(files)
+    assert (sorted(files) == sorted(find_files("", "./testdir")))
+
+    # consumer stops early, the crawl is cancelled
+    async def first_match():
+        matches = afind_files(".h", "./testdir", buffer_size=1)
+        async for match in matches:
+            await matches.aclose()
+            return match
+
+    output = asyncio.run(first_match())
+    print(output)
+    assert (output.endswith(".h"))
+
+    # event loop keeps running other tasks during the crawl
+    async def crawl_with_ticker():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0)
+
+        ticker_task = asyncio.create_task(ticker())
+        files = await collect("", "./testdir", max_open=2)
+        ticker_task.cancel()
+        return files, ticks
+
+    files, ticks = asyncio.run(crawl_with_ticker())
+    assert (len(ticks) > 0)
+
+    # edge cases
+    files = asyncio.run(collect(".c", "./abcd-ramz"))  # should return empty list
+    print(files)
+    assert (files == [])
+
+    files = asyncio.run(collect(None, None))  # should return empty list
+    print(files)
+    assert (files == [])
+
+
+test_cases()
+test_iter_files()
+test_iter_files_parallel()
+test_file_index()
+test_find_files_multi()
+test_afind_files()
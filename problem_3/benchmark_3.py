@@ -0,0 +1,226 @@
+"""
+Benchmarks for the huffman codecs in problem_3. Run from inside the problem_3 directory: `python benchmark_3.py`
+"""
+
+from queue import PriorityQueue
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from problem_3 import (HuffmanModel, Node, _count_bytes, _pack_codes_numpy, _pack_codes_translate,
+                       adaptive_huffman_decode, adaptive_huffman_encode, build_huffman_tree, canonical_codes,
+                       compress_file, compress_file_parallel, decompress_file, decompress_file_parallel,
+                       find_code_lengths, find_limited_code_lengths, huffman_decode_bytes, huffman_decoding,
+                       huffman_encode_bytes, huffman_encoding, np)
+
+MB = 1024 * 1024
+
+
+def text_corpus(size, seed=42):
+    # english like text: random words with a skewed word frequency
+    rng = random.Random(seed)
+    words = ["the", "of", "and", "to", "in", "is", "was", "that", "for", "huffman", "code", "tree", "data", "bits",
+             "compression", "symbol", "frequency", "table", "decode", "encode", "stream", "block", "value"]
+    weights = [1.0 / rank for rank in range(1, len(words) + 1)]
+    text = " ".join(rng.choices(words, weights=weights, k=size // 4))
+    return text.encode("ascii")[:size]
+
+
+def skewed_binary_corpus(size, seed=42):
+    # bytes with a geometric like distribution, a few values are very common and many are rare
+    rng = random.Random(seed)
+    weights = [0.8 ** value for value in range(256)]
+    return bytes(rng.choices(range(256), weights=weights, k=size))
+
+
+def corpora(size):
+    return [("text", text_corpus(size)), ("skewed binary", skewed_binary_corpus(size))]
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_bytes_codec(size=2 * MB):
+    print("\n-------Packed bytes codec ({} MB corpora)-----------".format(size // MB))
+    print("{:>14} {:>8} {:>14} {:>14}".format("corpus", "ratio", "encode MB/s", "decode MB/s"))
+    for name, data in corpora(size):
+        encoded, encode_time = measure(huffman_encode_bytes, data)
+        decoded, decode_time = measure(huffman_decode_bytes, encoded)
+        assert decoded == data
+        print("{:>14} {:>8.3f} {:>14.2f} {:>14.2f}".format(name, len(encoded) / len(data),
+                                                         size / MB / encode_time, size / MB / decode_time))
+
+
+def benchmark_decoders(size=1 * MB):
+    print("\n-------Decoding: tree walk vs lookup tables ({} MB corpora)-----------".format(size // MB))
+    print("{:>14} {:>16} {:>16} {:>10}".format("corpus", "tree walk MB/s", "tables MB/s", "speedup"))
+    for name, data in corpora(size):
+        # latin-1 maps each byte to one character so both decoders work on the same symbols
+        tree, coded_data = huffman_encoding(data.decode("latin-1"))
+        decoded, tree_time = measure(huffman_decoding, tree, coded_data)
+        assert decoded.encode("latin-1") == data
+
+        encoded = huffman_encode_bytes(data)
+        decoded, table_time = measure(huffman_decode_bytes, encoded)
+        assert decoded == data
+        print("{:>14} {:>16.2f} {:>16.2f} {:>9.1f}x".format(name, size / MB / tree_time, size / MB / table_time,
+                                                          tree_time / table_time))
+
+
+def benchmark_encoders(size=4 * MB):
+    print("\n-------Packing codes: str.translate vs NumPy ({} MB corpora)-----------".format(size // MB))
+    if np is None:
+        print("NumPy is not installed, only the str.translate encoder is available")
+    print("{:>14} {:>16} {:>16}".format("corpus", "translate MB/s", "NumPy MB/s"))
+    for name, data in corpora(size):
+        data = memoryview(data)
+        codes = canonical_codes(find_code_lengths(build_huffman_tree(_count_bytes(data))))
+        packed, translate_time = measure(_pack_codes_translate, data, codes)
+        numpy_speed = "-"
+        if np is not None:
+            numpy_packed, numpy_time = measure(_pack_codes_numpy, data, codes)
+            assert numpy_packed == packed
+            numpy_speed = "{:.2f}".format(size / MB / numpy_time)
+        print("{:>14} {:>16.2f} {:>16}".format(name, size / MB / translate_time, numpy_speed))
+
+
+def benchmark_messages(count=20000, training_messages=1000):
+    # short messages cut from the text corpus, the first ones are used to train the model
+    rng = random.Random(42)
+    text = text_corpus(count * 200)
+    messages = []
+    for _ in range(count):
+        start = rng.randrange(len(text) - 200)
+        messages.append(text[start:start + rng.randint(20, 200)])
+    model, train_time = measure(HuffmanModel.train, messages[:training_messages])
+
+    print("\n-------Short messages ({:,} messages of 20-200 bytes)-----------".format(count))
+    print("{:>26} {:>16} {:>16} {:>12}".format("", "encode msgs/s", "decode msgs/s", "ratio"))
+    size = sum(len(message) for message in messages)
+    for name, encode, decode in (("huffman_encode_bytes", huffman_encode_bytes, huffman_decode_bytes),
+                                 ("HuffmanModel", model.encode, model.decode)):
+        encoded, encode_time = measure(lambda: [encode(message) for message in messages])
+        decoded, decode_time = measure(lambda: [decode(message) for message in encoded])
+        assert decoded == messages
+        print("{:>26} {:>16,.0f} {:>16,.0f} {:>12.3f}".format(name, count / encode_time, count / decode_time,
+                                                              sum(map(len, encoded)) / size))
+    print("model trained in {:.4f}s, {} bytes serialized".format(train_time, len(model.to_bytes())))
+
+
+def benchmark_drift(size=256 * 1024):
+    # the distribution changes half way: text then binary data
+    data = text_corpus(size // 2) + skewed_binary_corpus(size // 2)
+    text_model = HuffmanModel.train([data[:size // 8]])
+    print("\n-------Drifting stream ({} KB: text then binary)-----------".format(size // 1024))
+    print("{:>34} {:>8} {:>14} {:>14}".format("", "ratio", "encode MB/s", "decode MB/s"))
+    for name, encode, decode in (("huffman_encode_bytes (whole data)", huffman_encode_bytes, huffman_decode_bytes),
+                                 ("HuffmanModel (trained on text)", text_model.encode, text_model.decode),
+                                 ("adaptive", adaptive_huffman_encode, adaptive_huffman_decode)):
+        encoded, encode_time = measure(encode, data)
+        decoded, decode_time = measure(decode, encoded)
+        assert decoded == data
+        print("{:>34} {:>8.3f} {:>14.2f} {:>14.2f}".format(name, len(encoded) / size, size / MB / encode_time,
+                                                           size / MB / decode_time))
+
+
+def priority_queue_huffman_tree(char_count_dict):
+    # baseline: the original construction, queue.PriorityQueue takes a lock on every put/get
+    queue = PriorityQueue()
+    for char, count in char_count_dict.items():
+        queue.put(Node(char, count))
+    while queue.qsize() > 1:
+        min1, min2 = (queue.get(), queue.get())
+        new_node = Node(frequency=min1.frequency + min2.frequency)
+        new_node.left = min1
+        new_node.right = min2
+        queue.put(new_node)
+    return queue.get()
+
+
+def benchmark_tree_build(alphabet_sizes=(256, 10000, 100000)):
+    print("\n-------Huffman tree construction-----------")
+    print("{:>10} {:>18} {:>14} {:>18}".format("symbols", "PriorityQueue s", "two-queue s", "package-merge s"))
+    rng = random.Random(42)
+    for size in alphabet_sizes:
+        counts = {symbol: rng.randint(1, 1000000) for symbol in range(size)}
+        _, queue_time = measure(priority_queue_huffman_tree, counts)
+        tree, two_queue_time = measure(build_huffman_tree, counts)
+        max_length = max(find_code_lengths(tree).values())
+        # limit the codes two bits below the huffman tree depth
+        _, package_merge_time = measure(find_limited_code_lengths, counts, max_length - 2)
+        print("{:>10,} {:>18.4f} {:>14.4f} {:>18.4f}".format(size, queue_time, two_queue_time, package_merge_time))
+
+
+def make_text_file(size):
+    # temporary directory with an input file of `size` bytes of text, and paths for the compressed and output files
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ("input", "compressed", "output")]
+    with open(paths[0], "wb") as file:
+        for seed in range(size // MB):
+            file.write(text_corpus(MB, seed=seed))
+    return directory, paths
+
+
+def remove_files(directory, paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    os.rmdir(directory)
+
+
+def benchmark_files(size=8 * MB, block_sizes=(256 * 1024, 1 * MB, 4 * MB)):
+    print("\n-------Block streaming files ({} MB text file)-----------".format(size // MB))
+    print("{:>12} {:>8} {:>14} {:>14} {:>16}".format("block size", "ratio", "compress MB/s", "decompress MB/s",
+                                                     "peak memory MB"))
+    directory, paths = make_text_file(size)
+    try:
+        for block_size in block_sizes:
+            compressed_size, compress_time = measure(compress_file, paths[0], paths[1], block_size)
+            _, decompress_time = measure(decompress_file, paths[1], paths[2])
+            # peak memory traced by python depends on the block size, not on the file size (separate run, tracing
+            # slows everything down)
+            tracemalloc.start()
+            compress_file(paths[0], paths[1], block_size)
+            decompress_file(paths[1], paths[2])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("{:>12,} {:>8.3f} {:>14.2f} {:>14.2f} {:>16.1f}".format(
+                block_size, compressed_size / size, size / MB / compress_time, size / MB / decompress_time, peak / MB))
+    finally:
+        remove_files(directory, paths)
+
+
+def benchmark_parallel(size=16 * MB, block_size=1 * MB):
+    worker_counts = sorted({1, 2, 4, 8, 16, os.cpu_count()} - {n for n in (2, 4, 8, 16) if n > os.cpu_count()})
+    print("\n-------Parallel block compression ({} MB text file, {} CPUs)-----------".format(size // MB,
+                                                                                          os.cpu_count()))
+    print("{:>8} {:>14} {:>16} {:>10}".format("workers", "compress MB/s", "decompress MB/s", "speedup"))
+    directory, paths = make_text_file(size)
+    try:
+        _, serial_time = measure(compress_file, paths[0], paths[1], block_size)
+        with open(paths[1], "rb") as file:
+            serial_output = file.read()
+        for workers in worker_counts:
+            _, compress_time = measure(compress_file_parallel, paths[0], paths[1], block_size, workers)
+            _, decompress_time = measure(decompress_file_parallel, paths[1], paths[2], workers)
+            with open(paths[1], "rb") as compressed, open(paths[0], "rb") as original, open(paths[2], "rb") as output:
+                assert compressed.read() == serial_output and output.read() == original.read()
+            print("{:>8} {:>14.2f} {:>16.2f} {:>9.1f}x".format(workers, size / MB / compress_time,
+                                                              size / MB / decompress_time, serial_time / compress_time))
+    finally:
+        remove_files(directory, paths)
+
+
+benchmark_bytes_codec()
+benchmark_decoders()
+benchmark_encoders()
+benchmark_tree_build()
+benchmark_messages()
+benchmark_drift()
+benchmark_files()
+benchmark_parallel()
@@ -9,8 +9,20 @@ Note:
 As a common convention, bit '0' represents following the left child and bit '1' represents following the right child.
 """
 
-from queue import PriorityQueue
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter, itemgetter
+import io
+import mmap
+import os
+import struct
 import sys
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:  # optional, encoding falls back to str.translate
+    np = None
 
 
 class Node(object):
@@ -23,7 +35,8 @@ class Node(object):
     def is_leaf_node(self):
         return self.left is None and self.right is None
 
-    # overriding < operator method to use this node in priority queue
+    # nodes are ordered by frequency, the tree is built with two queues but nodes can still go in a priority queue
+    # (the baseline of benchmark_3.py)
     def __lt__(self, other):
         return self.frequency < other.frequency
 
@@ -43,23 +56,35 @@ def build_huffman_tree(char_count_dict):
         2.3. Add the new node to the queue.
     3. The remaining node is the root node and the tree is complete.
 
+    Instead of a priority queue this uses the two-queue method: once the leaves are sorted by frequency, the internal
+    nodes are created in increasing frequency order too, so the two lowest nodes are always at the front of one of two
+    FIFO queues (sorted leaves and internal nodes). After sorting this is linear, and sorting an already sorted input is
+    linear too. Sorting is stable and ties prefer leaves, so the same counts always give the same tree.
+
     reference: https://en.wikipedia.org/wiki/Huffman_coding
 
     :param char_count_dict: dict
     :return: Node
     """
-    queue = PriorityQueue()
-    for char, count in char_count_dict.items():
-        queue.put(Node(char, count))
+    leaves = deque(sorted((Node(char, count) for char, count in char_count_dict.items()),
+                          key=attrgetter("frequency")))
+    internal_nodes = deque()
+
+    def pop_min():
+        if not internal_nodes or (leaves and leaves[0].frequency <= internal_nodes[0].frequency):
+            return leaves.popleft()
+        return internal_nodes.popleft()
 
-    while queue.qsize() > 1:
-        min1, min2 = (queue.get(), queue.get())
+    while len(leaves) + len(internal_nodes) > 1:
+        min1, min2 = (pop_min(), pop_min())
         new_node = Node(frequency=min1.frequency + min2.frequency)
         new_node.left = min1
         new_node.right = min2
-        queue.put(new_node)
+        internal_nodes.append(new_node)
 
-    return queue.get()
+    if not leaves and not internal_nodes:
+        return None
+    return (leaves or internal_nodes)[0]
 
 
 def __find_letter_codes(node, code_dict, code = ""):
@@ -68,18 +93,23 @@ def __find_letter_codes(node, code_dict, code = ""):
     Args:
         node(Node): Root node of huffman tree
         code_dict(dict): Dictionary containing letter codes
-        code: code built till this moment/depth in a recursive order
+        code: code of `node`
     Returns:
         dict: A dictionary containing letter codes
     """
-    if node is None:
-        return
+    # explicit stack instead of recursion, huffman trees can be deeper than the recursion limit
+    stack = [(node, code)]
+    while stack:
+        node, code = stack.pop()
+        if node is None:
+            continue
 
-    if node.is_leaf_node():
-        code_dict[node.character] = code
-
-    __find_letter_codes(node.left, code_dict, code + "0")
-    __find_letter_codes(node.right, code_dict, code + "1")
+        if node.is_leaf_node():
+            code_dict[node.character] = code
+        else:
+            stack.append((node.right, code + "1"))
+            stack.append((node.left, code + "0"))
+    return code_dict
 
 
 def find_letter_codes(node):
@@ -158,6 +188,947 @@ def huffman_decoding(tree, coded_data):
     return ''.join(letters)
 
 
+# packed byte format: magic, format version, length of the original data and number of symbols, followed by one
+# (symbol, code length) pair per symbol and the bitstream. Codes are canonical so their lengths are enough to rebuild
+# them, there is no need to store the tree
+_BYTES_MAGIC = b"HUF"
+_BYTES_VERSION = 2
+_BYTES_HEADER = struct.Struct("<3sBQH")
+# stream format: magic, format version and block size, followed by frames. A frame is the length of an encoded block
+# and the block encoded by `huffman_encode_bytes`, so every block has its own code and can be decoded on its own
+_STREAM_MAGIC = b"HUFS"
+_STREAM_VERSION = 1
+_STREAM_HEADER = struct.Struct("<4sBI")
+_FRAME_HEADER = struct.Struct("<I")
+_STREAM_BLOCK_SIZE = 1 << 20
+# number of input bytes turned into a '0'/'1' string at once while packing, bounds the temporary memory used
+_PACK_CHUNK_SIZE = 1 << 20
+# number of input bytes packed at once by the NumPy encoder, small enough for its index arrays (8 bytes per output
+# bit) to stay in the CPU cache
+_NUMPY_CHUNK_SIZE = 1 << 14
+
+
+def _pack_bit_strings(bit_strings):
+    """
+    Packs an iterable of '0'/'1' strings into bytes, most significant bit first. The last byte is padded with zeros.
+    The conversion itself runs in C through int(bits, 2).to_bytes()
+    """
+    packed = bytearray()
+    carry = ""
+    for bits in bit_strings:
+        bits = carry + bits
+        whole_bits = len(bits) - len(bits) % 8
+        if whole_bits:
+            packed += int(bits[:whole_bits], 2).to_bytes(whole_bits // 8, "big")
+        carry = bits[whole_bits:]
+    if carry:
+        packed += int(carry.ljust(8, "0"), 2).to_bytes(1, "big")
+    return packed
+
+
+def _count_bytes(data):
+    """
+    Counts the byte values of `data`
+    Returns:
+        dict: byte -> count, in byte order so that both ways of counting give the same huffman tree
+    """
+    if np is not None:
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256).tolist()
+        return {letter: count for letter, count in enumerate(counts) if count}
+    return dict(sorted(Counter(data).items()))
+
+
+def _pack_codes(data, codes):
+    """
+    Packs the codes of all bytes of `data`, most significant bit first, the last byte is padded with zeros
+    Args:
+        data(memoryview): bytes to encode
+        codes(dict): byte -> (code, length)
+    Returns:
+        bytearray: the bitstream
+    """
+    if np is not None:
+        return _pack_codes_numpy(data, codes)
+    return _pack_codes_translate(data, codes)
+
+
+def _pack_codes_translate(data, codes):
+    letter_codes_dict = {letter: format(code, "0{}b".format(length)) for letter, (code, length) in codes.items()}
+    # latin-1 maps every byte to the character of the same code point, so str.translate can replace all bytes of a
+    # chunk by their code in C instead of a Python loop per byte
+    chunks = (bytes(data[start:start + _PACK_CHUNK_SIZE]).decode("latin-1").translate(letter_codes_dict)
+              for start in range(0, len(data), _PACK_CHUNK_SIZE))
+    return _pack_bit_strings(chunks)
+
+
+def _pack_codes_numpy(data, codes):
+    """
+    Same as `_pack_codes` with array operations only: the bits of all codes are stored one after the other in
+    `code_bits`, and for every output bit a gather index into `code_bits` is computed from the code lengths (fancy
+    indexing), their cumulative sum (where each code starts) and `np.repeat`. `np.packbits` then packs the bits
+    """
+    lengths = np.zeros(256, dtype=np.int64)
+    bit_starts = np.zeros(256, dtype=np.int64)
+    code_bits = []
+    for letter, (code, length) in codes.items():
+        lengths[letter] = length
+        bit_starts[letter] = len(code_bits)
+        code_bits.extend(map(int, format(code, "0{}b".format(length))))
+    code_bits = np.array(code_bits, dtype=np.uint8)
+
+    packed = bytearray()
+    # bits of the previous chunk that didn't fill a whole byte
+    carry = np.zeros(0, dtype=np.uint8)
+    symbols = np.frombuffer(data, dtype=np.uint8)
+    for start in range(0, len(symbols), _NUMPY_CHUNK_SIZE):
+        chunk = symbols[start:start + _NUMPY_CHUNK_SIZE]
+        chunk_lengths = lengths[chunk]
+        code_ends = np.cumsum(chunk_lengths)
+        code_starts = code_ends - chunk_lengths
+        # output bit p belongs to the code of symbol i: code_bits[bit_starts[symbol i] + p - code_starts[i]]
+        bit_index = np.repeat(bit_starts[chunk] - code_starts, chunk_lengths) + np.arange(code_ends[-1])
+        bits = np.concatenate((carry, code_bits[bit_index]))
+        whole_bits = len(bits) - len(bits) % 8
+        packed += np.packbits(bits[:whole_bits]).tobytes()
+        carry = bits[whole_bits:]
+    packed += np.packbits(carry).tobytes()
+    return packed
+
+
+def find_code_lengths(node):
+    """
+    Iterative traversal of the huffman tree
+    Args:
+        node(Node): Root node of huffman tree
+    Returns:
+        dict: letter -> length of its code (depth of its leaf)
+    """
+    code_lengths = {}
+    if node is None:
+        return code_lengths
+    elif node.is_leaf_node():  # handle single node use case, its code is "0"
+        code_lengths[node.character] = 1
+        return code_lengths
+
+    stack = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node.is_leaf_node():
+            code_lengths[node.character] = depth
+        else:
+            stack.append((node.left, depth + 1))
+            stack.append((node.right, depth + 1))
+    return code_lengths
+
+
+def find_limited_code_lengths(char_count_dict, max_length):
+    """
+    Package-merge algorithm: optimal code lengths when no code may be longer than `max_length` bits.
+
+    Every letter is a coin of width 1/2^length for each length 1..max_length, the cheapest set of coins adding up
+    to n - 1 gives the code lengths (number of coins of a letter). Coins are packaged in pairs from the longest length
+    up, `O(n * max_length)`.
+    Args:
+        char_count_dict(dict): letter -> frequency
+        max_length(int): longest allowed code
+    Returns:
+        dict: letter -> length of its code, None if `max_length` is too small to give every letter a code
+    """
+    if len(char_count_dict) <= 1:
+        return {letter: 1 for letter in char_count_dict}
+    elif (1 << max_length) < len(char_count_dict):
+        return None
+
+    # a leaf is (frequency, letter), a package is (frequency, item, item)
+    leaves = sorted(((count, letter) for letter, count in char_count_dict.items()), key=itemgetter(0))
+    items = leaves
+    for _ in range(max_length - 1):
+        packages = [(items[i][0] + items[i + 1][0], items[i], items[i + 1]) for i in range(0, len(items) - 1, 2)]
+        # both lists are sorted, so this is a linear merge
+        items = sorted(leaves + packages, key=itemgetter(0))
+
+    code_lengths = dict.fromkeys(char_count_dict, 0)
+    stack = items[:2 * len(leaves) - 2]
+    while stack:
+        item = stack.pop()
+        if len(item) == 2:
+            code_lengths[item[1]] += 1
+        else:
+            stack.append(item[1])
+            stack.append(item[2])
+    return code_lengths
+
+
+def canonical_codes(code_lengths):
+    """
+    Assigns canonical huffman codes: letters sorted by (code length, letter) get consecutive codes, so a code is fully
+    described by the code lengths of all letters.
+    Args:
+        code_lengths(dict): letter -> code length
+    Returns:
+        dict: letter -> (code as int, code length)
+    """
+    codes = {}
+    code = 0
+    previous_length = 0
+    for length, letter in sorted((length, letter) for letter, length in code_lengths.items()):
+        code <<= length - previous_length
+        codes[letter] = (code, length)
+        code += 1
+        previous_length = length
+    return codes
+
+
+def _build_decode_table(codes):
+    """
+    Builds the lookup table used to decode a whole byte of the bitstream per step.
+
+    The codes are put in a binary trie (the canonical huffman tree). Every internal node of the trie is a decoding
+    state: "the bits read so far are this prefix of a code". The table is indexed by (state, next byte) and holds the
+    symbols completed while reading those 8 bits and the state reached after them. State 0 (the root) is the primary
+    table, used whenever the previous byte ended on a code boundary; the other states act as secondary tables that
+    continue codes straddling byte boundaries, so codes of any length are supported.
+
+    It is built in two steps, first a 4-bit table by walking the trie bit by bit and then the 8-bit table by combining
+    two 4-bit lookups, which keeps the build cheap even for 256 symbols.
+    Args:
+        codes: (byte, (code, length)) pairs of a complete prefix code, a byte may have several codes
+    Returns:
+        list: entry `state * 256 + byte` is (decoded symbols as bytes, next state * 256)
+    """
+    children = [[None, None]]
+    leaves = {}
+    for symbol, (code, length) in codes:
+        node = 0
+        for shift in range(length - 1, -1, -1):
+            bit = (code >> shift) & 1
+            if children[node][bit] is None:
+                children[node][bit] = len(children)
+                children.append([None, None])
+            node = children[node][bit]
+        leaves[node] = symbol
+
+    states = {}
+    for node in range(len(children)):
+        if node not in leaves:
+            states[node] = len(states)
+
+    nibble_table = [None] * (len(states) * 16)
+    for node, state in states.items():
+        for nibble in range(16):
+            symbols = bytearray()
+            current = node
+            for shift in (3, 2, 1, 0):
+                current = children[current][(nibble >> shift) & 1]
+                if current in leaves:
+                    symbols.append(leaves[current])
+                    current = 0
+            nibble_table[state * 16 + nibble] = (bytes(symbols), states[current])
+
+    table = [None] * (len(states) * 256)
+    for state in range(len(states)):
+        for high in range(16):
+            high_symbols, middle_state = nibble_table[state * 16 + high]
+            for low in range(16):
+                low_symbols, next_state = nibble_table[middle_state * 16 + low]
+                table[state * 256 + high * 16 + low] = (high_symbols + low_symbols, next_state * 256)
+    return table
+
+
+def _table_decode(data, length, decode_table):
+    """
+    Decodes `length` symbols from packed bytes with the table built by `_build_decode_table`, one lookup per byte.
+    Returns:
+        bytearray: the decoded symbols or None if the `length`-th symbol doesn't end in the last byte of `data`
+            (truncated or extended bitstream)
+    """
+    output = bytearray()
+    state = 0
+    # the last byte is decoded separately to check where the data ends
+    for start in range(0, len(data) - 1, _PACK_CHUNK_SIZE):
+        parts = []
+        append = parts.append
+        for byte in data[start:min(start + _PACK_CHUNK_SIZE, len(data) - 1)]:
+            symbols, state = decode_table[state + byte]
+            append(symbols)
+        output += b"".join(parts)
+    if not data or len(output) >= length:
+        return None
+    output += decode_table[state + data[-1]][0]
+    if len(output) < length:
+        return None
+    # symbols decoded from the padding of the last byte are dropped
+    del output[length:]
+    return output
+
+
+def _is_complete_code(code_lengths):
+    # Kraft equality, every bit sequence can be decoded (sum of 2^-length over all codes == 1)
+    max_length = max(code_lengths.values())
+    return sum(1 << (max_length - length) for length in code_lengths.values()) == 1 << max_length
+
+
+def huffman_encode_bytes(data, max_code_length=None):
+    """
+    Encodes binary data with a canonical huffman code of its byte values.
+    Args:
+        data(bytes, bytearray or memoryview): data to encode
+        max_code_length(int): optional limit on the length of the codes (at least 8, at most 255), codes are then
+            computed with package-merge if the huffman tree is deeper
+    Returns:
+        bytes: header (original length and code length of every byte value) followed by the packed bitstream, 1 bit per
+            encoded bit instead of one character per bit like `huffman_encoding`
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        print("Invalid Data!")
+        return None
+    elif max_code_length is not None and not 8 <= max_code_length <= 255:
+        # 8 bits are needed to give a code to all 256 byte values, the header stores lengths in one byte
+        print("Invalid code length limit!")
+        return None
+
+    data = memoryview(data).cast("B")
+    if len(data) == 0:
+        return _BYTES_HEADER.pack(_BYTES_MAGIC, _BYTES_VERSION, 0, 0)
+
+    counts = _count_bytes(data)
+    code_lengths = find_code_lengths(build_huffman_tree(counts))
+    if max_code_length is not None and max(code_lengths.values()) > max_code_length:
+        code_lengths = find_limited_code_lengths(counts, max_code_length)
+    header = bytearray(_BYTES_HEADER.pack(_BYTES_MAGIC, _BYTES_VERSION, len(data), len(code_lengths)))
+    for letter, length in sorted(code_lengths.items()):
+        header += bytes((letter, length))
+    return bytes(header + _pack_codes(data, canonical_codes(code_lengths)))
+
+
+def huffman_decode_bytes(encoded):
+    """
+    Decodes data encoded by `huffman_encode_bytes`
+    Args:
+        encoded(bytes, bytearray or memoryview): header and packed bitstream
+    Returns:
+        bytes: the original data
+    """
+    if not isinstance(encoded, (bytes, bytearray, memoryview)) or len(encoded) < _BYTES_HEADER.size:
+        print("Invalid Data!")
+        return None
+
+    encoded = bytes(encoded)
+    magic, version, length, symbol_count = _BYTES_HEADER.unpack_from(encoded)
+    lengths_end = _BYTES_HEADER.size + 2 * symbol_count
+    if magic != _BYTES_MAGIC or version != _BYTES_VERSION or len(encoded) < lengths_end:
+        print("Invalid Data!")
+        return None
+    if length == 0:
+        return b""
+
+    lengths = encoded[_BYTES_HEADER.size:lengths_end]
+    code_lengths = dict(zip(lengths[0::2], lengths[1::2]))
+    bitstream = encoded[lengths_end:]
+    if len(code_lengths) == 1:  # single letter, special case
+        # one bit per letter, check it before allocating the output so that a corrupted length can't be huge
+        if len(bitstream) != (length + 7) // 8:
+            print("Corrupted Data!")
+            return None
+        return bytes(code_lengths) * length
+    if 0 in code_lengths.values() or not _is_complete_code(code_lengths):
+        print("Corrupted Data!")
+        return None
+
+    decoded = _table_decode(bitstream, length, _build_decode_table(canonical_codes(code_lengths).items()))
+    if decoded is None:
+        print("Corrupted Data!")
+        return None
+    return bytes(decoded)
+
+
+def _encode_frames(blocks):
+    # frame every block: length of the encoded block then the encoded block
+    for block in blocks:
+        encoded = huffman_encode_bytes(block)
+        yield _FRAME_HEADER.pack(len(encoded))
+        yield encoded
+
+
+def _read_blocks(source, block_size):
+    # reads full blocks (a stream may return less than asked before its end) into a reused buffer
+    view = memoryview(bytearray(block_size))
+    while True:
+        size = 0
+        while size < block_size:
+            read = source.readinto(view[size:])
+            if not read:
+                break
+            size += read
+        if size == 0:
+            return
+        yield view[:size]
+        if size < block_size:
+            return
+
+
+def compress_stream(source, destination, block_size=_STREAM_BLOCK_SIZE):
+    """
+    Compresses a binary stream block by block, only one block is in memory at a time.
+    Args:
+        source: binary file like object to read from (`readinto`)
+        destination: binary file like object to write the compressed stream to
+        block_size(int): number of input bytes per block, each block gets its own code
+    Returns:
+        int: number of bytes written
+    """
+    if not isinstance(block_size, int) or not 0 < block_size < 1 << 32:
+        print("Invalid block size!")
+        return None
+
+    written = destination.write(_STREAM_HEADER.pack(_STREAM_MAGIC, _STREAM_VERSION, block_size))
+    for frame in _encode_frames(_read_blocks(source, block_size)):
+        written += destination.write(frame)
+    return written
+
+
+def _frame_offsets(data):
+    """
+    Finds the encoded blocks of a compressed stream without decoding them
+    Args:
+        data(bytes, mmap or memoryview): the whole compressed stream
+    Returns:
+        list: (offset, size) of every encoded block, None if the stream is invalid or truncated
+    """
+    if len(data) < _STREAM_HEADER.size or _STREAM_HEADER.unpack_from(data)[:2] != (_STREAM_MAGIC, _STREAM_VERSION):
+        return None
+
+    offsets = []
+    position = _STREAM_HEADER.size
+    while position < len(data):
+        if position + _FRAME_HEADER.size > len(data):
+            return None
+        size, = _FRAME_HEADER.unpack_from(data, position)
+        position += _FRAME_HEADER.size
+        if position + size > len(data):
+            return None
+        offsets.append((position, size))
+        position += size
+    return offsets
+
+
+def decompress_block(data, offset, size):
+    """
+    Decodes one block of a compressed stream, blocks don't depend on each other
+    Args:
+        data(bytes, mmap or memoryview): the whole compressed stream
+        offset(int), size(int): position of the block as given by `_frame_offsets`
+    Returns:
+        bytes: the original data of the block, None if the block is corrupted
+    """
+    with memoryview(data) as view:
+        return huffman_decode_bytes(view[offset:offset + size])
+
+
+def _block_length(data, offset, size, block_size):
+    """
+    Decoded length of an encoded block read from its header, checked against the block without decoding it: the
+    stream never has blocks longer than `block_size` and every letter takes at least as many bits as the shortest
+    code, so all of them must fit in the bitstream of the block
+    Returns:
+        int: decoded length of the block, None if the header can't be the header of this block
+    """
+    if size < _BYTES_HEADER.size:
+        return None
+    magic, version, length, symbol_count = _BYTES_HEADER.unpack_from(data, offset)
+    lengths_end = _BYTES_HEADER.size + 2 * symbol_count
+    if magic != _BYTES_MAGIC or version != _BYTES_VERSION or size < lengths_end or length > block_size:
+        return None
+    if length == 0:
+        return 0
+    code_lengths = bytes(data[offset + _BYTES_HEADER.size:offset + lengths_end])[1::2]
+    if not code_lengths or length * min(code_lengths) > 8 * (size - lengths_end):
+        return None
+    return length
+
+
+def decompress_stream(source, destination):
+    """
+    Decompresses a stream written by `compress_stream` block by block
+    Args:
+        source: binary file like object to read the compressed stream from
+        destination: binary file like object to write the original data to
+    Returns:
+        int: number of bytes written, None if the stream is invalid or corrupted
+    """
+    header = source.read(_STREAM_HEADER.size)
+    if len(header) < _STREAM_HEADER.size or _STREAM_HEADER.unpack(header)[:2] != (_STREAM_MAGIC, _STREAM_VERSION):
+        print("Invalid Data!")
+        return None
+
+    # largest encoded block: header, every byte value with its code length, and codes of at most 255 bits
+    block_size = _STREAM_HEADER.unpack(header)[2]
+    max_frame_size = _BYTES_HEADER.size + 2 * 256 + (block_size * 255 + 7) // 8
+    written = 0
+    while True:
+        frame_header = source.read(_FRAME_HEADER.size)
+        if not frame_header:
+            return written
+        decoded = None
+        if len(frame_header) == _FRAME_HEADER.size:
+            size, = _FRAME_HEADER.unpack(frame_header)
+            # frame and block lengths are checked before anything of their size is read or allocated
+            block = source.read(size) if size <= max_frame_size else b""
+            if len(block) == size and _block_length(block, 0, size, block_size) is not None:
+                decoded = huffman_decode_bytes(block)
+        if decoded is None:
+            print("Corrupted Data!")
+            return None
+        written += destination.write(decoded)
+
+
+def _map_file(file):
+    # empty files can't be memory mapped
+    if os.fstat(file.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def compress_file(input_path, output_path, block_size=_STREAM_BLOCK_SIZE):
+    """
+    Compresses a file into the format of `compress_stream`. The input is memory mapped, blocks are slices of the
+    mapping (no copy) paged in by the OS on demand, so files larger than the memory can be compressed
+    Returns:
+        int: size of the compressed file
+    """
+    if not isinstance(block_size, int) or not 0 < block_size < 1 << 32:
+        print("Invalid block size!")
+        return None
+
+    with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+        data = _map_file(source)
+        try:
+            with memoryview(data) as view:
+                written = destination.write(_STREAM_HEADER.pack(_STREAM_MAGIC, _STREAM_VERSION, block_size))
+                blocks = (view[start:start + block_size] for start in range(0, len(view), block_size))
+                for frame in _encode_frames(blocks):
+                    written += destination.write(frame)
+                return written
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+def decompress_file(input_path, output_path):
+    """
+    Decompresses a file written by `compress_file`/`compress_stream`
+    Returns:
+        int: size of the decompressed file, None if the input is invalid or corrupted
+    """
+    with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+        return decompress_stream(source, destination)
+
+
+def _compress_block_at(input_path, offset, size):
+    # runs in a worker process: the worker maps the input file itself, so the block is never copied between processes
+    with open(input_path, "rb") as source:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with memoryview(data) as view:
+                return huffman_encode_bytes(view[offset:offset + size])
+
+
+def _decompress_block_to(input_path, offset, size, output_path, output_offset):
+    # runs in a worker process: decodes one block and writes it at its place in the output file, so decoded data is
+    # never sent back to the parent process
+    with open(input_path, "rb") as source:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            decoded = decompress_block(data, offset, size)
+    if decoded is None:
+        return None
+    with open(output_path, "r+b") as destination:
+        destination.seek(output_offset)
+        return destination.write(decoded)
+
+
+def _write_frame(destination, encoded):
+    return destination.write(_FRAME_HEADER.pack(len(encoded))) + destination.write(encoded)
+
+
+def compress_file_parallel(input_path, output_path, block_size=_STREAM_BLOCK_SIZE, workers=None):
+    """
+    Same output as `compress_file`, blocks are encoded by a pool of processes. Workers read their block from the
+    memory mapped input (shared pages of the OS cache) and only send back the encoded block. Frames are written in
+    block order, at most 2 blocks per worker are in flight so memory doesn't grow with the file size
+    Args:
+        workers(int): number of processes, default is the number of CPUs
+    Returns:
+        int: size of the compressed file
+    """
+    if not isinstance(block_size, int) or not 0 < block_size < 1 << 32:
+        print("Invalid block size!")
+        return None
+    workers = workers or os.cpu_count()
+
+    input_size = os.path.getsize(input_path)
+    with open(output_path, "wb") as destination, ProcessPoolExecutor(workers) as executor:
+        written = destination.write(_STREAM_HEADER.pack(_STREAM_MAGIC, _STREAM_VERSION, block_size))
+        pending = deque()
+        for offset in range(0, input_size, block_size):
+            if len(pending) >= 2 * workers:
+                written += _write_frame(destination, pending.popleft().result())
+            pending.append(executor.submit(_compress_block_at, input_path, offset, min(block_size, input_size - offset)))
+        while pending:
+            written += _write_frame(destination, pending.popleft().result())
+    return written
+
+
+def decompress_file_parallel(input_path, output_path, workers=None):
+    """
+    Same as `decompress_file`, blocks are decoded by a pool of processes. The decoded size of every block is in its
+    header, so the output file is allocated first and every worker writes its block directly at its offset
+    Args:
+        workers(int): number of processes, default is the number of CPUs
+    Returns:
+        int: size of the decompressed file, None if the input is invalid or corrupted
+    """
+    workers = workers or os.cpu_count()
+    with open(input_path, "rb") as source:
+        data = _map_file(source)
+        try:
+            if len(data) < _STREAM_HEADER.size or _STREAM_HEADER.unpack_from(data)[:2] != (_STREAM_MAGIC,
+                                                                                            _STREAM_VERSION):
+                print("Invalid Data!")
+                return None
+            offsets = _frame_offsets(data)
+            if offsets is None:
+                print("Corrupted Data!")
+                return None
+            # check every block before allocating the output, a corrupted length could make it huge
+            block_size = _STREAM_HEADER.unpack_from(data)[2]
+            output_offsets = [0]
+            for offset, size in offsets:
+                length = _block_length(data, offset, size, block_size)
+                if length is None:
+                    print("Corrupted Data!")
+                    return None
+                output_offsets.append(output_offsets[-1] + length)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    with open(output_path, "wb") as destination:
+        destination.truncate(output_offsets[-1])
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_decompress_block_to, input_path, offset, size, output_path, output_offset)
+                   for (offset, size), output_offset in zip(offsets, output_offsets)]
+        if any(future.result() is None for future in futures):
+            print("Corrupted Data!")
+            return None
+    return output_offsets[-1]
+
+
+def _encode_varint(value):
+    # LEB128: 7 bits per byte, high bit set on all bytes but the last
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append(value & 0x7f | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _decode_varint(data):
+    # returns (value, position after the varint) or None if `data` doesn't start with a varint
+    value = 0
+    for position, byte in enumerate(data[:10]):
+        value |= (byte & 0x7f) << (7 * position)
+        if byte < 0x80:
+            return value, position + 1
+    return None
+
+
+class HuffmanModel(object):
+    """
+    Static huffman code trained once on sample data, then reused to encode and decode any number of messages.
+
+    Encoding a short message with `huffman_encode_bytes` counts it, builds a tree and tables and stores a header,
+    which costs more than encoding the message itself. A model does all of that once: a message is then encoded with
+    a single `str.translate` and decoded with the table decoder, and only its length is stored in front of it.
+
+    Bytes not seen in the samples use the ESCAPE symbol: its code followed by the 8 bits of the byte. For the decoder
+    these are just 256 more codes (escape code + byte), the code stays complete and the same table decoder works.
+    """
+    ESCAPE = 256
+    _MAGIC = b"HUFM"
+    _VERSION = 1
+    _HEADER = struct.Struct("<4sBH")
+    _ENTRY = struct.Struct("<HB")
+
+    def __init__(self, code_lengths):
+        """
+        Args:
+            code_lengths(dict): symbol (byte or ESCAPE) -> code length, must be a complete code with ESCAPE in it
+        """
+        self.code_lengths = dict(code_lengths)
+        codes = canonical_codes(self.code_lengths)
+        escape_code, escape_length = codes.pop(self.ESCAPE)
+        # unseen bytes first, seen bytes replace their escaped code with their own code
+        all_codes = {letter: ((escape_code << 8) | letter, escape_length + 8) for letter in range(256)}
+        all_codes.update(codes)
+        self._encode_table = {letter: format(code, "0{}b".format(length)) for letter, (code, length) in all_codes.items()}
+        # the decoder knows both codes of a seen byte, the escaped one is never written
+        self._decode_table = _build_decode_table(list(codes.items()) + [
+            (letter, ((escape_code << 8) | letter, escape_length + 8)) for letter in range(256)])
+
+    @classmethod
+    def train(cls, samples, max_code_length=None):
+        """
+        Args:
+            samples: iterable of messages (bytes) representative of the data to encode
+            max_code_length(int): optional limit on the length of the codes (at most 255), see
+                `find_limited_code_lengths`
+        Returns:
+            HuffmanModel: the model, None if there is no sample data or the limit is too small for its symbols
+        """
+        counts = Counter()
+        for sample in samples:
+            counts.update(bytes(sample))
+        if not counts:
+            print("Empty Data!")
+            return None
+
+        counts = dict(sorted(counts.items()))
+        counts[cls.ESCAPE] = 1
+        if max_code_length is not None and not (0 < max_code_length <= 255 and len(counts) <= 1 << max_code_length):
+            # every symbol needs a code (9 bits when all 256 byte values and the escape are present), the serialized
+            # model stores lengths in one byte
+            print("Invalid code length limit!")
+            return None
+        code_lengths = find_code_lengths(build_huffman_tree(counts))
+        if max_code_length is not None and max(code_lengths.values()) > max_code_length:
+            code_lengths = find_limited_code_lengths(counts, max_code_length)
+        return cls(code_lengths)
+
+    def to_bytes(self):
+        serialized = bytearray(self._HEADER.pack(self._MAGIC, self._VERSION, len(self.code_lengths)))
+        for symbol, length in sorted(self.code_lengths.items()):
+            serialized += self._ENTRY.pack(symbol, length)
+        return bytes(serialized)
+
+    @classmethod
+    def from_bytes(cls, serialized):
+        """
+        Args:
+            serialized(bytes): model written by `to_bytes`
+        Returns:
+            HuffmanModel: the model, None if `serialized` is not a valid model
+        """
+        if not isinstance(serialized, (bytes, bytearray, memoryview)) or len(serialized) < cls._HEADER.size:
+            print("Invalid Data!")
+            return None
+        magic, version, count = cls._HEADER.unpack_from(serialized)
+        if magic != cls._MAGIC or version != cls._VERSION or len(serialized) != cls._HEADER.size + count * \
+                cls._ENTRY.size:
+            print("Invalid Data!")
+            return None
+
+        code_lengths = dict(cls._ENTRY.iter_unpack(serialized[cls._HEADER.size:]))
+        if len(code_lengths) != count or len(code_lengths) < 2 or cls.ESCAPE not in code_lengths or \
+                max(code_lengths) > cls.ESCAPE or 0 in code_lengths.values() or not _is_complete_code(code_lengths):
+            print("Invalid Data!")
+            return None
+        return cls(code_lengths)
+
+    def encode(self, message):
+        """
+        Args:
+            message(bytes, bytearray or memoryview): message to encode
+        Returns:
+            bytes: length of the message (varint) followed by the packed bitstream
+        """
+        if not isinstance(message, (bytes, bytearray, memoryview)):
+            print("Invalid Data!")
+            return None
+        message = bytes(message)
+        bits = message.decode("latin-1").translate(self._encode_table)
+        return _encode_varint(len(message)) + bytes(_pack_bit_strings((bits,)))
+
+    def decode(self, encoded):
+        """
+        Args:
+            encoded(bytes): message encoded by `encode` with the same model
+        Returns:
+            bytes: the message, None if `encoded` is corrupted
+        """
+        if not isinstance(encoded, (bytes, bytearray, memoryview)) or _decode_varint(encoded) is None:
+            print("Invalid Data!")
+            return None
+        length, position = _decode_varint(encoded)
+        if length == 0 and position == len(encoded):
+            return b""
+        decoded = _table_decode(bytes(encoded[position:]), length, self._decode_table) if length else None
+        if decoded is None:
+            print("Corrupted Data!")
+            return None
+        return bytes(decoded)
+
+    def __eq__(self, other):
+        return isinstance(other, HuffmanModel) and self.code_lengths == other.code_lengths
+
+    def __repr__(self):
+        return "HuffmanModel({} symbols)".format(len(self.code_lengths))
+
+
+class _AdaptiveNode(object):
+    def __init__(self, symbol=None):
+        self.symbol = symbol
+        self.weight = 0
+        self.parent = None
+        self.left = None
+        self.right = None
+        # position in the node order (0 is the root)
+        self.order = 0
+
+
+class AdaptiveHuffmanCoder(object):
+    """
+    Adaptive huffman code (FGK algorithm). There is no model to train or to store: encoder and decoder start with the
+    same empty tree and update it the same way after every symbol, so the code follows the data as it goes.
+
+    The tree keeps the sibling property: in the node order (root first, right child before left child) the weights
+    never increase. To add 1 to a leaf, each node on its path to the root is first swapped with the first node of its
+    weight in the order (unless that is its parent), then incremented, which keeps the property.
+    Symbols not seen yet are sent as the code of the NYT ("not yet transmitted") leaf followed by their 8 bits, the
+    NYT leaf then splits into a new NYT leaf and the leaf of the new symbol.
+
+    One coder instance is used for one direction of one stream, `encode_symbol` on one side and `decode_symbol` on the
+    other.
+    """
+
+    def __init__(self):
+        self._root = self._nyt = _AdaptiveNode()
+        self._nodes = [self._root]
+        self._leaves = {}
+
+    def _code(self, node):
+        bits = []
+        while node.parent is not None:
+            bits.append("1" if node is node.parent.right else "0")
+            node = node.parent
+        return "".join(reversed(bits))
+
+    def _swap(self, a, b):
+        # exchange the subtrees rooted at `a` and `b` and their positions in the order
+        a_parent, b_parent = a.parent, b.parent
+        a_is_left, b_is_left = a_parent.left is a, b_parent.left is b
+        if a_is_left:
+            a_parent.left = b
+        else:
+            a_parent.right = b
+        if b_is_left:
+            b_parent.left = a
+        else:
+            b_parent.right = a
+        a.parent, b.parent = b_parent, a_parent
+        self._nodes[a.order], self._nodes[b.order] = b, a
+        a.order, b.order = b.order, a.order
+
+    def _update(self, symbol):
+        node = self._leaves.get(symbol)
+        if node is None:
+            parent = self._nyt
+            node = _AdaptiveNode(symbol)
+            self._nyt = _AdaptiveNode()
+            parent.right, parent.left = node, self._nyt
+            node.parent = self._nyt.parent = parent
+            node.order, self._nyt.order = len(self._nodes), len(self._nodes) + 1
+            self._nodes += [node, self._nyt]
+            self._leaves[symbol] = node
+
+        while node is not None:
+            # nodes of the same weight are next to each other in the order, find the first one
+            leader = node
+            while leader.order > 0 and self._nodes[leader.order - 1].weight == node.weight:
+                leader = self._nodes[leader.order - 1]
+            if leader is not node and leader is not node.parent:
+                self._swap(node, leader)
+            node.weight += 1
+            node = node.parent
+
+    def encode_symbol(self, symbol):
+        """
+        Args:
+            symbol(int): byte to encode
+        Returns:
+            str: its code as a '0'/'1' string
+        """
+        node = self._leaves.get(symbol)
+        code = self._code(node) if node is not None else self._code(self._nyt) + format(symbol, "08b")
+        self._update(symbol)
+        return code
+
+    def decode_symbol(self, bits, position):
+        """
+        Args:
+            bits(str): '0'/'1' string
+            position(int): where the code of the symbol starts in `bits`
+        Returns:
+            tuple: (decoded byte, position after its code)
+        """
+        node = self._root
+        while node.left is not None:
+            node = node.right if bits[position] == "1" else node.left
+            position += 1
+        if node is self._nyt:
+            symbol = int(bits[position:position + 8], 2)
+            position += 8
+        else:
+            symbol = node.symbol
+        self._update(symbol)
+        return symbol, position
+
+
+def adaptive_huffman_encode(data):
+    """
+    Encodes data with an adaptive huffman code, nothing but the length is stored besides the bitstream
+    Args:
+        data(bytes, bytearray or memoryview): data to encode
+    Returns:
+        bytes: length of the data (varint) followed by the packed bitstream
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        print("Invalid Data!")
+        return None
+    coder = AdaptiveHuffmanCoder()
+    data = bytes(data)
+    bits = "".join(map(coder.encode_symbol, data))
+    return _encode_varint(len(data)) + bytes(_pack_bit_strings((bits,)))
+
+
+def adaptive_huffman_decode(encoded):
+    """
+    Decodes data encoded by `adaptive_huffman_encode`
+    Returns:
+        bytes: the original data, None if `encoded` is corrupted
+    """
+    if not isinstance(encoded, (bytes, bytearray, memoryview)) or _decode_varint(encoded) is None:
+        print("Invalid Data!")
+        return None
+    length, position = _decode_varint(encoded)
+    bitstream = bytes(encoded[position:])
+    bits = format(int.from_bytes(bitstream, "big"), "0{}b".format(8 * len(bitstream))) if bitstream else ""
+
+    coder = AdaptiveHuffmanCoder()
+    decoded = bytearray()
+    position = 0
+    try:
+        for _ in range(length):
+            symbol, position = coder.decode_symbol(bits, position)
+            decoded.append(symbol)
+    except (IndexError, ValueError):  # ran out of bits
+        decoded = None
+    # the last code must end in the last byte
+    if decoded is None or (position + 7) // 8 != len(bitstream):
+        print("Corrupted Data!")
+        return None
+    return bytes(decoded)
+
+
 def test_case(a_great_sentence):
     print("\n-------Test-----------")
     tree, encoded_data = huffman_encoding(a_great_sentence)
@@ -174,6 +1145,220 @@ def test_case(a_great_sentence):
     assert(a_great_sentence == decoded_data)
 
 
+def test_bytes_case(data):
+    print("\n-------Bytes Test-----------")
+    encoded_data = huffman_encode_bytes(data)
+    decoded_data = huffman_decode_bytes(encoded_data)
+
+    print("The size of the data is: {}".format(len(data)))
+    print("The size of the encoded data is: {}".format(len(encoded_data)))
+    print("The size of the decoded data is: {}".format(len(decoded_data)))
+    assert (bytes(data) == decoded_data)
+
+
+def run_bytes_test_cases():
+    test_bytes_case(b"The bird is the word")
+    test_bytes_case(bytearray(b"a + b = c + d"))
+    test_bytes_case(memoryview(b"My name is Ramiz"))
+    test_bytes_case(bytes(range(256)) * 4)
+
+    # codes longer than a byte (fibonacci like frequencies give a very deep tree)
+    fibonacci = [1, 1]
+    while len(fibonacci) < 20:
+        fibonacci.append(fibonacci[-1] + fibonacci[-2])
+    fibonacci_data = b"".join(bytes([letter]) * count for letter, count in enumerate(fibonacci))
+    # both encoders give the same bitstream (codes longer than 64 bits, more than one chunk)
+    if np is not None:
+        for data in (fibonacci_data, bytes(range(256)) * 2000 + b"a" * 100000, b"aaab"):
+            assert (_count_bytes(data) == dict(sorted(Counter(data).items())))
+            codes = canonical_codes(find_code_lengths(build_huffman_tree(Counter(data))))
+            assert (_pack_codes_numpy(memoryview(data), codes) == _pack_codes_translate(memoryview(data), codes))
+    test_bytes_case(fibonacci_data)
+    # same data with codes limited to 8 bits
+    limited_data = huffman_encode_bytes(fibonacci_data, max_code_length=8)
+    assert (huffman_decode_bytes(limited_data) == fibonacci_data)
+    assert (len(limited_data) > len(huffman_encode_bytes(fibonacci_data)))
+    limited_lengths = find_limited_code_lengths(Counter(fibonacci_data), 8)
+    assert (max(limited_lengths.values()) == 8)
+    assert (sum(2 ** -length for length in limited_lengths.values()) == 1)
+    # a limit that isn't reached gives huffman code lengths
+    counts = Counter(b"The bird is the word")
+    huffman_lengths = find_code_lengths(build_huffman_tree(counts))
+    assert (sum(counts[letter] * length for letter, length in find_limited_code_lengths(counts, 16).items()) ==
+            sum(counts[letter] * length for letter, length in huffman_lengths.items()))
+    assert (find_limited_code_lengths({"a": 1, "b": 1, "c": 1}, 1) is None)
+
+    # tree deeper than the recursion limit, codes are computed without recursion
+    deep_tree = build_huffman_tree({letter: 2 ** letter for letter in range(2000)})
+    assert (len(find_letter_codes(deep_tree)[0]) == 1999)
+    assert (max(find_code_lengths(deep_tree).values()) == 1999)
+    # equal frequencies, ties are broken the same way every time
+    assert (find_letter_codes(build_huffman_tree({"a": 1, "b": 1, "c": 1, "d": 1})) ==
+            {"a": "00", "b": "01", "c": "10", "d": "11"})
+
+    # canonical codes only depend on code lengths
+    codes = canonical_codes({"a": 1, "b": 2, "c": 3, "d": 3})
+    print(codes)  # should print {'a': (0, 1), 'b': (2, 2), 'c': (6, 3), 'd': (7, 3)}
+    assert (codes == {"a": (0, 1), "b": (2, 2), "c": (6, 3), "d": (7, 3)})
+
+    # packed output is smaller than the input for redundant data
+    data = b"aaaaabbbbccccc" * 1000
+    encoded_data = huffman_encode_bytes(data)
+    test_bytes_case(data)
+    assert (len(encoded_data) < len(data) // 4)
+
+    # repetitive alphabet
+    test_bytes_case(b"aaaaa")
+    test_bytes_case(b"\x00" * 9)
+
+    # empty input
+    test_bytes_case(b"")
+
+    # invalid input
+    print("----Edge input related cases----")
+    huffman_encode_bytes("text")  # should print "Invalid Data!"
+    huffman_encode_bytes(None)  # should print "Invalid Data!"
+    huffman_decode_bytes(b"abc")  # should print "Invalid Data!"
+    huffman_decode_bytes(b"not huffman encoded data")  # should print "Invalid Data!"
+    huffman_decode_bytes(huffman_encode_bytes(b"abcd")[:-1])  # should print "Corrupted Data!"
+    huffman_decode_bytes(huffman_encode_bytes(b"abcd") + b"extra")  # should print "Corrupted Data!"
+    # single letter with a forged huge length, should print "Corrupted Data!"
+    forged = bytearray(huffman_encode_bytes(b"aaaa"))
+    _BYTES_HEADER.pack_into(forged, 0, _BYTES_MAGIC, _BYTES_VERSION, 1 << 62, 1)
+    assert (huffman_decode_bytes(forged) is None)
+    huffman_encode_bytes(b"abcd", max_code_length=4)  # should print "Invalid code length limit!"
+
+
+def test_stream_case(data, block_size):
+    print("\n-------Stream Test-----------")
+    compressed = io.BytesIO()
+    compress_stream(io.BytesIO(data), compressed, block_size)
+    decompressed = io.BytesIO()
+    decompress_stream(io.BytesIO(compressed.getvalue()), decompressed)
+
+    print("The size of the data is: {}".format(len(data)))
+    print("The size of the compressed data is: {}".format(len(compressed.getvalue())))
+    print("The size of the decompressed data is: {}".format(len(decompressed.getvalue())))
+    assert (decompressed.getvalue() == data)
+    return compressed.getvalue()
+
+
+def run_stream_test_cases():
+    text = b"The bird is the word. My name is Ramiz. a + b = c + d. " * 100
+    test_stream_case(text, 1 << 20)  # a single block
+    compressed = test_stream_case(text, 64)
+    test_stream_case(bytes(range(256)) * 10, 1000)  # last block is smaller
+    test_stream_case(b"", 64)
+
+    # every block can be decoded on its own
+    offsets = _frame_offsets(compressed)
+    assert (len(offsets) == (len(text) + 63) // 64)
+    assert (decompress_block(compressed, *offsets[5]) == text[5 * 64:6 * 64])
+    assert (b"".join(decompress_block(compressed, *offset) for offset in offsets) == text)
+
+    # files
+    directory = tempfile.mkdtemp()
+    try:
+        paths = [os.path.join(directory, name) for name in ("input", "compressed", "output")]
+        for data in (text, b""):
+            with open(paths[0], "wb") as file:
+                file.write(data)
+            compress_file(paths[0], paths[1], block_size=1000)
+            assert (decompress_file(paths[1], paths[2]) == len(data))
+            with open(paths[2], "rb") as file:
+                assert (file.read() == data)
+            # the parallel versions read and write the same format. Only when run as a script: while this module is
+            # being imported (tests run at import) the pool can't pickle its functions, the import lock is held
+            if __name__ == "__main__":
+                with open(paths[1], "rb") as file:
+                    compressed_file = file.read()
+                compress_file_parallel(paths[0], paths[1], block_size=1000, workers=2)
+                with open(paths[1], "rb") as file:
+                    assert (file.read() == compressed_file)
+                assert (decompress_file_parallel(paths[1], paths[2], workers=2) == len(data))
+                with open(paths[2], "rb") as file:
+                    assert (file.read() == data)
+
+        # a forged block length is rejected before the output is allocated, should print "Corrupted Data!"
+        with open(paths[0], "wb") as file:
+            file.write(text)
+        compress_file(paths[0], paths[1], block_size=1000)
+        with open(paths[1], "r+b") as file:
+            forged = bytearray(file.read())
+            offset = _frame_offsets(forged)[0][0]
+            _BYTES_HEADER.pack_into(forged, offset, _BYTES_MAGIC, _BYTES_VERSION, 1 << 40,
+                                    _BYTES_HEADER.unpack_from(forged, offset)[3])
+            file.seek(0)
+            file.write(forged)
+        assert (decompress_file_parallel(paths[1], paths[2], workers=2) is None)
+        assert (not os.path.exists(paths[2]) or os.path.getsize(paths[2]) <= len(text))
+    finally:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(directory)
+
+    print("----Edge input related cases----")
+    compress_stream(io.BytesIO(text), io.BytesIO(), 0)  # should print "Invalid block size!"
+    decompress_stream(io.BytesIO(b"not compressed"), io.BytesIO())  # should print "Invalid Data!"
+    decompress_stream(io.BytesIO(compressed[:-1]), io.BytesIO())  # should print "Corrupted Data!"
+    assert (_frame_offsets(compressed[:-1]) is None)
+    # forged frame and block lengths are rejected before reading or allocating, should print "Corrupted Data!" twice
+    forged = bytearray(compressed)
+    _FRAME_HEADER.pack_into(forged, _STREAM_HEADER.size, 0xFFFFFFFF)
+    assert (decompress_stream(io.BytesIO(forged), io.BytesIO()) is None)
+    forged = bytearray(compressed)
+    offset = _frame_offsets(forged)[0][0]
+    _BYTES_HEADER.pack_into(forged, offset, _BYTES_MAGIC, _BYTES_VERSION, 1 << 40,
+                            _BYTES_HEADER.unpack_from(forged, offset)[3])
+    assert (decompress_stream(io.BytesIO(forged), io.BytesIO()) is None)
+
+
+def run_model_test_cases():
+    print("\n-------Model Test-----------")
+    samples = [b"The bird is the word", b"My name is Ramiz", b"a + b = c + d"]
+    model = HuffmanModel.train(samples)
+    for message in samples + [b"Unseen bytes \x00\xff!", b"", b"eeeeeeeeeeeeeeeeee"]:
+        encoded = model.encode(message)
+        assert (model.decode(encoded) == message)
+    # only the length is stored in front of a message, much smaller than a message with its own code
+    assert (len(model.encode(samples[0])) < len(huffman_encode_bytes(samples[0])) // 2)
+    print("The size of the model is: {}".format(len(model.to_bytes())))
+    print("The size of an encoded message is: {}".format(len(model.encode(samples[0]))))
+
+    # serialized models encode and decode the same way
+    loaded_model = HuffmanModel.from_bytes(model.to_bytes())
+    assert (loaded_model == model)
+    assert (loaded_model.decode(model.encode(b"a bird")) == b"a bird")
+    # package-merge limit, unseen bytes take escape + 8 bits
+    limited_model = HuffmanModel.train([bytes(range(256)) * 2, b"a" * 100000], max_code_length=9)
+    assert (max(limited_model.code_lengths.values()) == 9)
+    assert (limited_model.decode(limited_model.encode(bytes(range(256)))) == bytes(range(256)))
+    # 256 byte values and the escape do not fit in 8 bits codes, should print "Invalid code length limit!"
+    assert (HuffmanModel.train([bytes(range(256))], max_code_length=8) is None)
+    assert (max(HuffmanModel.train([b"abc"], max_code_length=8).code_lengths.values()) <= 8)
+
+    print("\n-------Adaptive Test-----------")
+    for data in (b"The bird is the word", bytes(range(256)) * 3, b"a", b"", b"abracadabra" * 100 + bytes(range(256))):
+        encoded = adaptive_huffman_encode(data)
+        assert (adaptive_huffman_decode(encoded) == data)
+        print("The size of the data is: {}, encoded: {}".format(len(data), len(encoded)))
+    # sibling property: weights never increase along the node order
+    coder = AdaptiveHuffmanCoder()
+    for symbol in b"abracadabra, the bird is the word":
+        coder.encode_symbol(symbol)
+    weights = [node.weight for node in coder._nodes]
+    assert (weights == sorted(weights, reverse=True))
+
+    print("----Edge input related cases----")
+    HuffmanModel.train([])  # should print "Empty Data!"
+    HuffmanModel.from_bytes(b"not a model")  # should print "Invalid Data!"
+    model.encode("text")  # should print "Invalid Data!"
+    model.decode(model.encode(samples[0])[:-1])  # should print "Corrupted Data!"
+    adaptive_huffman_encode(None)  # should print "Invalid Data!"
+    adaptive_huffman_decode(adaptive_huffman_encode(b"The bird is the word")[:-1])  # should print "Corrupted Data!"
+
+
 def run_test_cases():
     test_case("The bird is the word")
     test_case("My name is Ramiz")
@@ -196,4 +1381,7 @@ def run_test_cases():
     huffman_decoding(Node(), 123) # should print "invalid data"
 
 
-run_test_cases()
\ No newline at end of file
+run_test_cases()
+run_bytes_test_cases()
+run_stream_test_cases()
+run_model_test_cases()
@@ -0,0 +1,120 @@
+"""
+Benchmarks for the group membership lookups in problem_4. Run from inside the problem_4 directory:
+`python benchmark_4.py`
+"""
+
+import contextlib
+import io
+import random
+import time
+
+from problem_4 import Group, MembershipGraph, MembershipIndex, is_user_in_group
+
+
+def make_hierarchy(group_count, user_count, extra_parents=0.2, seed=42):
+    """
+    Random hierarchy: group 0 is the root, every other group is below a random earlier group (a DAG) and some groups
+    are also below a second one. Every user is in one random group.
+    """
+    rng = random.Random(seed)
+    groups = [Group("group{}".format(n)) for n in range(group_count)]
+    for n in range(1, group_count):
+        groups[rng.randrange(n)].add_group(groups[n])
+        if rng.random() < extra_parents:
+            groups[rng.randrange(n)].add_group(groups[n])
+    users = ["user{}".format(n) for n in range(user_count)]
+    for user in users:
+        groups[rng.randrange(group_count)].add_user(user)
+    return groups, users
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_bulk_queries(group_count=2000, user_count=100000, batch_size=10000, queries=20):
+    groups, users = make_hierarchy(group_count, user_count)
+    rng = random.Random(1)
+    batch = rng.sample(users, batch_size)
+    query_groups = rng.sample(groups[:group_count // 10], queries)
+    query_users = rng.sample(users, queries)
+
+    print("\n-------Bulk membership ({:,} groups, {:,} users)-----------".format(group_count, user_count))
+    index, compile_time = measure(MembershipIndex, groups[0])
+    print("{:>44} {:>10.4f}s".format("compile MembershipIndex", compile_time))
+
+    traversal, traversal_time = measure(
+        lambda: [{user for user in batch if is_user_in_group(user, group)} for group in query_groups])
+    compiled, compiled_time = measure(lambda: list(index.users_in_groups(query_groups, batch).values()))
+    assert traversal == compiled
+    print("{:>44} {:>10.4f}s traversal {:>10.4f}s index".format(
+        "{} groups x {:,} users".format(queries, batch_size), traversal_time, compiled_time))
+
+    traversal, traversal_time = measure(
+        lambda: [{group for group in groups if is_user_in_group(user, group)} for user in query_users])
+    compiled, compiled_time = measure(lambda: [index.groups_of_user(user) for user in query_users])
+    assert traversal == compiled
+    print("{:>44} {:>10.4f}s traversal {:>10.4f}s index".format(
+        "groups of {} users".format(queries), traversal_time, compiled_time))
+
+
+def benchmark_incremental_closure(group_count=100000, user_count=1000000, extra_parents=0.05, operations=100000):
+    print("\n-------Incremental closure ({:,} groups, {:,} users)-----------".format(group_count, user_count))
+    rng = random.Random(42)
+    graph = MembershipGraph()
+    groups = [Group("group{}".format(n)) for n in range(group_count)]
+    users = ["user{}".format(n) for n in range(user_count)]
+
+    def build_groups():
+        for n in range(1, group_count):
+            graph.add_group(groups[rng.randrange(n)], groups[n])
+            if rng.random() < extra_parents:
+                graph.add_group(groups[rng.randrange(n)], groups[n])
+
+    user_groups = {}
+
+    def build_users():
+        for user in users:
+            user_groups[user] = groups[rng.randrange(group_count)]
+            graph.add_user(user_groups[user], user)
+
+    _, elapsed = measure(build_groups)
+    print("{:>36} {:>14,.0f} ops/s".format("add_group (build)", group_count / elapsed))
+    _, elapsed = measure(build_users)
+    print("{:>36} {:>14,.0f} ops/s".format("add_user (build)", user_count / elapsed))
+
+    # mutations of the built hierarchy: move a random group below another one (remove + add), move users
+    moved_groups = [groups[rng.randrange(1, group_count)] for _ in range(operations // 10)]
+
+    def move_groups():
+        for group in moved_groups:
+            for parent in list(group.parents):
+                graph.remove_group(parent, group)
+            while not graph.add_group(groups[rng.randrange(group_count)], group):
+                pass
+
+    def move_users():
+        for _ in range(operations):
+            user = users[rng.randrange(user_count)]
+            graph.remove_user(user_groups[user], user)
+            user_groups[user] = groups[rng.randrange(group_count)]
+            graph.add_user(user_groups[user], user)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # rejected cycles print a warning
+        _, elapsed = measure(move_groups)
+    print("{:>36} {:>14,.0f} ops/s".format("move group (remove + add)", len(moved_groups) / elapsed))
+    _, elapsed = measure(move_users)
+    print("{:>36} {:>14,.0f} ops/s".format("move user (remove + add)", operations / elapsed))
+
+    query_pairs = [(users[rng.randrange(user_count)], groups[rng.randrange(group_count // 100)])
+                   for _ in range(operations)]
+    _, elapsed = measure(lambda: [graph.is_user_in_group(user, group) for user, group in query_pairs])
+    print("{:>36} {:>14,.0f} ops/s".format("is_user_in_group", operations / elapsed))
+    _, elapsed = measure(lambda: [graph.groups_of_user(user) for user, _ in query_pairs])
+    print("{:>36} {:>14,.0f} ops/s".format("groups_of_user", operations / elapsed))
+
+
+benchmark_bulk_queries()
+benchmark_incremental_closure()
@@ -5,18 +5,49 @@ We can construct this hierarchy as such. Where User is represented by str repres
 Write a function that provides an efficient look up of whether the user is in a group.
 """
 
+from collections import deque
+import contextlib
+import io
+import random
+
 
 class Group(object):
     def __init__(self, _name):
         self.name = _name
-        self.groups = []
-        self.users = []
+        self.groups = set()
+        self.users = set()
+        # groups containing this group, their memoized users have to be invalidated when this group changes
+        self.parents = set()
+        # memoized users of this group and all its sub-groups, None until computed or after a change
+        self._all_users = None
+        # True if this group or a group above it may have memoized users, otherwise changes have nothing to invalidate
+        self._memoized_above = False
 
     def add_group(self, group):
-        self.groups.append(group)
+        if group in self.groups:
+            return
+        self.groups.add(group)
+        group.parents.add(self)
+        self._invalidate()
 
     def add_user(self, user):
-        self.users.append(user)
+        if user in self.users:
+            return
+        self.users.add(user)
+        self._invalidate()
+
+    def remove_group(self, group):
+        if group not in self.groups:
+            return
+        self._invalidate()
+        self.groups.remove(group)
+        group.parents.discard(self)
+
+    def remove_user(self, user):
+        if user not in self.users:
+            return
+        self._invalidate()
+        self.users.remove(user)
 
     def get_groups(self):
         return self.groups
@@ -27,10 +58,51 @@ class Group(object):
     def get_name(self):
         return self.name
 
+    def get_all_users(self):
+        """
+        Users of this group and of all its sub-groups, at any depth. Computed once with an iterative traversal (safe
+        against cycles) and memoized until a user or a group is added somewhere below this group.
+        Returns:
+            frozenset: user names/ids
+        """
+        if self._all_users is None:
+            all_users = set()
+            visited = {self}
+            stack = [self]
+            while stack:
+                group = stack.pop()
+                group._memoized_above = True
+                all_users |= group.users
+                for sub_group in group.groups:
+                    if sub_group not in visited:
+                        visited.add(sub_group)
+                        stack.append(sub_group)
+            self._all_users = frozenset(all_users)
+        return self._all_users
+
+    def _invalidate(self):
+        # this group and every group containing it (directly or not) have new members. The walk stops at groups with
+        # nothing memoized above them, and after it nothing is memoized above the groups it went through
+        if not self._memoized_above:
+            return
+        self._memoized_above = False
+        stack = [self]
+        while stack:
+            group = stack.pop()
+            group._all_users = None
+            for parent in group.parents:
+                if parent._memoized_above:
+                    parent._memoized_above = False
+                    stack.append(parent)
+
+    def __repr__(self):
+        return "Group({})".format(self.name)
+
 
 def is_user_in_group(user, group):
     """
     Return True if user is in the group, False otherwise.
+    The first lookup in a group computes its members, next lookups are a set lookup, O(1).
 
     Args:
       user(str): user name/id
@@ -39,15 +111,375 @@ def is_user_in_group(user, group):
     if user is None or len(user) == 0 or group is None:
         return False
 
-    if user in group.users:
+    return user in group.get_all_users()
+
+
+def _bit_positions(bits):
+    # positions of the set bits of an int, the search for '1's runs in C on its binary string
+    binary = bin(bits)[:1:-1]  # least significant bit first
+    position = binary.find("1")
+    while position != -1:
+        yield position
+        position = binary.find("1", position + 1)
+
+
+def _bitset(ids):
+    # int bitset of a list of ids, bits are set in a bytearray and converted to an int once
+    bitset = bytearray(max(ids, default=-1) // 8 + 1)
+    for item_id in ids:
+        bitset[item_id >> 3] |= 1 << (item_id & 7)
+    return int.from_bytes(bitset, "little")
+
+
+class MembershipIndex(object):
+    """
+    Read optimized snapshot of the hierarchy below some groups, for bulk queries in both directions: which of these
+    users are in a group and which groups contain a user.
+
+    Groups and users are interned as int ids. Groups of a cycle all have the same members, so the groups are first
+    merged into strongly connected components (Tarjan's algorithm), which form a DAG. In topological order of that DAG,
+    the members of a component are its own users plus the members of the components below it, and its ancestors are
+    its own groups plus the ancestors of the components above it. Both are bitsets (Python ints) so each step is one
+    OR of machine words. Users are interned bottom up, so the users of low groups have small ids and small bitsets.
+
+    The snapshot doesn't see later changes of the groups, compile a new one after the hierarchy changed.
+    """
+
+    def __init__(self, *groups):
+        """
+        Args:
+            groups(class:Group): the snapshot contains these groups and all groups below them
+        """
+        self._groups = []
+        self._group_ids = {}
+        for root in groups:
+            self._collect(root)
+        self._children = [[self._group_ids[sub_group] for sub_group in group.groups] for group in self._groups]
+        components = self._strongly_connected_components()
+
+        self._users = []
+        self._user_ids = {}
+        # first direct group of every user, and the other ones of the users in several groups (no list per user). The
+        # groups containing a user at any depth are the ancestors of its direct groups
+        self._user_group = []
+        self._other_user_groups = {}
+        # member bitsets are kept as little endian bytes, testing one user reads one byte instead of shifting an int
+        self._members = [b""] * len(self._groups)
+        self._ancestors = [0] * len(self._groups)
+        # components are in reverse topological order: every component comes after the components below it
+        component_members = []
+        for component in components:
+            user_ids = []
+            for group_id in component:
+                for user in self._groups[group_id].users:
+                    user_id = self._user_ids.get(user)
+                    if user_id is None:
+                        user_id = self._user_ids[user] = len(self._users)
+                        self._users.append(user)
+                        self._user_group.append(group_id)
+                    else:
+                        self._other_user_groups.setdefault(user_id, []).append(group_id)
+                    user_ids.append(user_id)
+            # own users are set in a bytearray and converted once, setting bits of an int copies it for every user
+            members = _bitset(user_ids)
+            for group_id in component:
+                for child in self._children[group_id]:
+                    if self._component[child] != self._component[group_id]:
+                        members |= component_members[self._component[child]]
+            component_members.append(members)
+            members_bytes = members.to_bytes((members.bit_length() + 7) // 8, "little")
+            for group_id in component:
+                self._members[group_id] = members_bytes
+
+        component_ancestors = [0] * len(components)
+        for component_id in range(len(components) - 1, -1, -1):
+            ancestors = component_ancestors[component_id] | _bitset(components[component_id])
+            for group_id in components[component_id]:
+                self._ancestors[group_id] = ancestors
+                for child in self._children[group_id]:
+                    component_ancestors[self._component[child]] |= ancestors
+
+    def _collect(self, root):
+        # iterative traversal, interns every group reachable from `root`
+        if root in self._group_ids:
+            return
+        self._group_ids[root] = len(self._groups)
+        self._groups.append(root)
+        stack = [root]
+        while stack:
+            for sub_group in stack.pop().groups:
+                if sub_group not in self._group_ids:
+                    self._group_ids[sub_group] = len(self._groups)
+                    self._groups.append(sub_group)
+                    stack.append(sub_group)
+
+    def _strongly_connected_components(self):
+        """
+        Iterative Tarjan's algorithm, sets `self._component` (component id of every group)
+        Returns:
+            list: group ids of every component, in reverse topological order
+        """
+        count = len(self._groups)
+        index = [-1] * count
+        low_link = [0] * count
+        on_stack = [False] * count
+        stack = []
+        components = []
+        self._component = [0] * count
+        counter = 0
+        for start in range(count):
+            if index[start] != -1:
+                continue
+            # (group, next child to visit) frames instead of recursion
+            work = [(start, 0)]
+            while work:
+                group_id, child_position = work.pop()
+                if child_position == 0:
+                    index[group_id] = low_link[group_id] = counter
+                    counter += 1
+                    stack.append(group_id)
+                    on_stack[group_id] = True
+                children = self._children[group_id]
+                while child_position < len(children):
+                    child = children[child_position]
+                    child_position += 1
+                    if index[child] == -1:
+                        work.append((group_id, child_position))
+                        work.append((child, 0))
+                        break
+                    elif on_stack[child]:
+                        low_link[group_id] = min(low_link[group_id], index[child])
+                else:
+                    if low_link[group_id] == index[group_id]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            self._component[member] = len(components)
+                            component.append(member)
+                            if member == group_id:
+                                break
+                        components.append(component)
+                    if work:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[group_id])
+        return components
+
+    def is_user_in_group(self, user, group):
+        group_id = self._group_ids.get(group)
+        user_id = self._user_ids.get(user)
+        if group_id is None or user_id is None:
+            return False
+        members = self._members[group_id]
+        return user_id >> 3 < len(members) and members[user_id >> 3] >> (user_id & 7) & 1 == 1
+
+    def _user_bitset(self, users):
+        # bitset of the known users of `users`
+        return _bitset([user_id for user_id in map(self._user_ids.get, users) if user_id is not None])
+
+    def users_in_group(self, group, users=None):
+        """
+        Args:
+            group(class:Group): group of the snapshot
+            users: users to check, all members of the group if None
+        Returns:
+            set: the users that are in the group
+        """
+        return self.users_in_groups([group], users)[group]
+
+    def users_in_groups(self, groups, users=None):
+        """
+        Same as `users_in_group` for several groups, `users` is turned into a bitset once and each group costs one
+        AND of bitsets
+        Returns:
+            dict: group -> set of its users
+        """
+        batch = -1 if users is None else self._user_bitset(users)
+        result = {}
+        for group in groups:
+            group_id = self._group_ids.get(group)
+            members = 0 if group_id is None else int.from_bytes(self._members[group_id], "little") & batch
+            result[group] = {self._users[user_id] for user_id in _bit_positions(members)}
+        return result
+
+    def groups_of_user(self, user):
+        """
+        Returns:
+            set: groups of the snapshot containing the user, directly or through sub-groups
+        """
+        user_id = self._user_ids.get(user)
+        if user_id is None:
+            return set()
+        ancestors = self._ancestors[self._user_group[user_id]]
+        for group_id in self._other_user_groups.get(user_id, ()):
+            ancestors |= self._ancestors[group_id]
+        return {self._groups[group_id] for group_id in _bit_positions(ancestors)}
+
+    def groups_of_users(self, users):
+        """
+        Returns:
+            dict: user -> set of groups containing it, for every user of `users`
+        """
+        return {user: self.groups_of_user(user) for user in users}
+
+
+class MembershipGraph(object):
+    """
+    Transitive closure of a group hierarchy, kept up to date while groups and users are added and removed.
+
+    Every group has the set of groups above it (ancestors) and below it (descendants) at any depth. Users are not part
+    of the closure: a user is in a group if one of its direct groups is that group or below it, so adding or removing
+    a user is O(1) and doesn't touch any other group. Adding an edge parent -> child only touches the pairs it
+    connects: descendants of the parent's ancestors and ancestors of the child's descendants. A cycle is detected in
+    O(1) (the child is already above the parent) and the edge is rejected. Removing an edge checks the same pairs
+    only, keeping those still connected by another path through the direct edges.
+
+    Changes must go through the graph, which also applies them to the groups.
+    """
+
+    def __init__(self):
+        self._ancestors = {}
+        self._descendants = {}
+        # user -> tuple of the groups containing it directly (usually one, a tuple is much smaller than a set)
+        self._user_groups = {}
+
+    @classmethod
+    def from_groups(cls, *groups):
+        """
+        Builds the closure of existing groups and everything below them
+        Returns:
+            MembershipGraph: the graph, None if the hierarchy has a cycle
+        """
+        graph = cls()
+        visited = set(groups)
+        queue = deque(groups)
+        while queue:
+            group = queue.popleft()
+            graph._register(group)
+            for user in group.users:
+                graph._user_groups[user] = graph._user_groups.get(user, ()) + (group,)
+            for sub_group in group.groups:
+                graph._register(sub_group)
+                if sub_group is group or sub_group in graph._ancestors[group]:
+                    print("Cycle detected!")
+                    return None
+                graph._link(group, sub_group)
+                if sub_group not in visited:
+                    visited.add(sub_group)
+                    queue.append(sub_group)
+        return graph
+
+    def _register(self, group):
+        if group not in self._ancestors:
+            self._ancestors[group] = set()
+            self._descendants[group] = set()
+
+    def _link(self, parent, child):
+        parent_side = self._ancestors[parent] | {parent}
+        child_side = self._descendants[child] | {child}
+        for group in parent_side:
+            self._descendants[group] |= child_side
+        for group in child_side:
+            self._ancestors[group] |= parent_side
+
+    def add_group(self, parent, child):
+        """
+        Adds `child` as a sub-group of `parent`
+        Returns:
+            bool: False if the edge would create a cycle, it is not added then
+        """
+        self._register(parent)
+        self._register(child)
+        if child is parent or child in self._ancestors[parent]:
+            print("Cycle detected!")
+            return False
+        if child not in parent.groups:
+            parent.add_group(child)
+            self._link(parent, child)
         return True
 
-    # search in sub-groups
-    for sub_group in group.groups:
-        return is_user_in_group(user, sub_group)
+    def remove_group(self, parent, child):
+        """
+        Removes `child` from the sub-groups of `parent`
+        """
+        if child not in parent.groups or parent not in self._ancestors:
+            return
+        parent.remove_group(child)
 
-    # user not found
-    return False
+        # only pairs (group above parent, group below child) may have lost their path. A group above another has
+        # more descendants and fewer ancestors than it, so sorting by the old sizes checks every group after the
+        # groups it depends on
+        parent_side = self._ancestors[parent] | {parent}
+        child_side = self._descendants[child] | {child}
+        for group in sorted(parent_side, key=lambda group: len(self._descendants[group])):
+            # groups of the child side still below `group` through one of its sub-groups
+            still_below = set()
+            for sub_group in group.groups:
+                if sub_group in child_side:
+                    still_below.add(sub_group)
+                still_below |= child_side & self._descendants[sub_group]
+            self._descendants[group] -= child_side - still_below
+        for group in sorted(child_side, key=lambda group: len(self._ancestors[group])):
+            still_above = set()
+            for parent_group in group.parents:
+                if parent_group in parent_side:
+                    still_above.add(parent_group)
+                if parent_group in self._ancestors:
+                    still_above |= parent_side & self._ancestors[parent_group]
+            self._ancestors[group] -= parent_side - still_above
+
+    def add_user(self, group, user):
+        self._register(group)
+        if user not in group.users:
+            group.add_user(user)
+            self._user_groups[user] = self._user_groups.get(user, ()) + (group,)
+
+    def remove_user(self, group, user):
+        if user not in group.users or group not in self._ancestors:
+            return
+        group.remove_user(user)
+        user_groups = tuple(user_group for user_group in self._user_groups[user] if user_group is not group)
+        if user_groups:
+            self._user_groups[user] = user_groups
+        else:
+            del self._user_groups[user]
+
+    def is_user_in_group(self, user, group):
+        for user_group in self._user_groups.get(user, ()):
+            if user_group is group or group in self._ancestors[user_group]:
+                return True
+        return False
+
+    def is_group_in_group(self, group, parent):
+        return group in self._descendants.get(parent, ())
+
+    def groups_of_user(self, user):
+        """
+        Returns:
+            set: groups containing the user, directly or through sub-groups
+        """
+        groups = set()
+        for user_group in self._user_groups.get(user, ()):
+            groups.add(user_group)
+            groups |= self._ancestors[user_group]
+        return groups
+
+    def users_in_group(self, group, users=None):
+        """
+        Args:
+            group(class:Group): group of the graph
+            users: users to check, all members of the group if None
+        Returns:
+            set: the users that are in the group
+        """
+        if group not in self._descendants:
+            return set()
+        if users is not None:
+            return {user for user in users if self.is_user_in_group(user, group)}
+        members = set(group.users)
+        for sub_group in self._descendants[group]:
+            members |= sub_group.users
+        return members
 
 
 def test():
@@ -83,4 +515,190 @@ def test():
     assert (output is False)
 
 
+def test_membership():
+    # user in the second sub-group, not only the first one is searched
+    parent = Group("parent")
+    first_child = Group("first_child")
+    second_child = Group("second_child")
+    parent.add_group(first_child)
+    parent.add_group(second_child)
+    second_child.add_user("second_child_user")
+    assert (is_user_in_group("second_child_user", parent) is True)
+    assert (is_user_in_group("second_child_user", first_child) is False)
+
+    # memoized members are invalidated when the hierarchy below a group changes
+    assert (is_user_in_group("new_user", parent) is False)
+    first_child.add_user("new_user")
+    assert (is_user_in_group("new_user", parent) is True)
+    grand_child = Group("grand_child")
+    grand_child.add_user("grand_child_user")
+    assert (is_user_in_group("grand_child_user", parent) is False)
+    second_child.add_group(grand_child)
+    assert (is_user_in_group("grand_child_user", parent) is True)
+    grand_child.add_user("late_user")  # two levels down
+    assert (is_user_in_group("late_user", parent) is True)
+    assert (parent.get_all_users() == {"second_child_user", "new_user", "grand_child_user", "late_user"})
+
+    # cycles: every group of the cycle has the users of all of them
+    a, b, c = Group("a"), Group("b"), Group("c")
+    a.add_group(b)
+    b.add_group(c)
+    c.add_group(a)
+    c.add_user("c_user")
+    assert (is_user_in_group("c_user", a) is True)
+    a.add_user("a_user")
+    assert (is_user_in_group("a_user", b) is True)
+    assert (a.get_all_users() == b.get_all_users() == c.get_all_users() == {"a_user", "c_user"})
+
+    # diamond: the same group reachable twice
+    top, left, right, bottom = Group("top"), Group("left"), Group("right"), Group("bottom")
+    top.add_group(left)
+    top.add_group(right)
+    left.add_group(bottom)
+    right.add_group(bottom)
+    bottom.add_user("bottom_user")
+    assert (is_user_in_group("bottom_user", top) is True)
+
+    # deeper than the recursion limit
+    root = group = Group("level0")
+    for level in range(1, 5000):
+        sub_group = Group("level{}".format(level))
+        group.add_group(sub_group)
+        group = sub_group
+    group.add_user("deep_user")
+    assert (is_user_in_group("deep_user", root) is True)
+
+    # edge cases
+    assert (is_user_in_group("bottom_user", None) is False)
+    assert (is_user_in_group("", top) is False)
+
+
+def test_membership_index():
+    # hierarchy with a cycle (b <-> c), a diamond (d below b and e) and a group outside the snapshot
+    a, b, c, d, e, outside = (Group(name) for name in ("a", "b", "c", "d", "e", "outside"))
+    a.add_group(b)
+    a.add_group(e)
+    b.add_group(c)
+    c.add_group(b)
+    b.add_group(d)
+    e.add_group(d)
+    a.add_user("a_user")
+    c.add_user("c_user")
+    d.add_user("d_user")
+    e.add_user("e_user")
+    outside.add_user("outside_user")
+    outside.add_group(a)
+
+    index = MembershipIndex(a)
+    groups = [a, b, c, d, e]
+    users = ["a_user", "c_user", "d_user", "e_user", "outside_user", "nobody"]
+    # same answers as the traversal for every (user, group) pair
+    for group in groups:
+        for user in users:
+            assert (index.is_user_in_group(user, group) == is_user_in_group(user, group))
+        assert (index.users_in_group(group, users) == {user for user in users if is_user_in_group(user, group)})
+        assert (index.users_in_group(group) == group.get_all_users())
+
+    assert (index.groups_of_user("d_user") == {a, b, c, d, e})
+    assert (index.groups_of_user("c_user") == {a, b, c})
+    assert (index.groups_of_user("e_user") == {a, e})
+    assert (index.groups_of_users(["a_user", "nobody"]) == {"a_user": {a}, "nobody": set()})
+    assert (index.users_in_groups([b, e], ["c_user", "e_user"]) == {b: {"c_user"}, e: {"e_user"}})
+    # groups outside the snapshot are unknown
+    assert (index.groups_of_user("outside_user") == set())
+    assert (index.users_in_group(outside, users) == set())
+
+    # deeper than the recursion limit
+    root = group = Group("level0")
+    for level in range(1, 5000):
+        sub_group = Group("level{}".format(level))
+        group.add_group(sub_group)
+        group = sub_group
+    group.add_user("deep_user")
+    index = MembershipIndex(root)
+    assert (index.is_user_in_group("deep_user", root) is True)
+    assert (len(index.groups_of_user("deep_user")) == 5000)
+
+
+def test_membership_graph():
+    graph = MembershipGraph()
+    a, b, c, d = Group("a"), Group("b"), Group("c"), Group("d")
+    assert (graph.add_group(a, b) is True)
+    graph.add_group(b, c)
+    graph.add_group(a, d)
+    graph.add_group(d, c)
+    graph.add_user(c, "c_user")
+    assert (graph.is_user_in_group("c_user", a) is True)
+    assert (graph.groups_of_user("c_user") == {a, b, c, d})
+    assert (graph.users_in_group(a) == {"c_user"})
+
+    # cycles are rejected
+    assert (graph.add_group(c, a) is False)  # should print "Cycle detected!"
+    assert (graph.add_group(b, b) is False)  # should print "Cycle detected!"
+    assert (a not in c.groups)
+
+    # c is still below a through d after b -> c is removed
+    graph.remove_group(b, c)
+    assert (graph.is_user_in_group("c_user", a) is True)
+    assert (graph.is_user_in_group("c_user", b) is False)
+    graph.remove_group(d, c)
+    assert (graph.is_user_in_group("c_user", a) is False)
+    assert (graph.add_group(c, a) is True)  # no cycle anymore
+    assert (graph.is_group_in_group(b, c) is True)
+    graph.remove_user(c, "c_user")
+    assert (graph.groups_of_user("c_user") == set())
+
+    # random changes, the closure always matches a traversal of the groups
+    rng = random.Random(7)
+    groups = [Group("group{}".format(n)) for n in range(30)]
+    users = ["user{}".format(n) for n in range(40)]
+    graph = MembershipGraph()
+    for _ in range(600):
+        parent, child = rng.sample(groups, 2)
+        operation = rng.random()
+        if operation < 0.4:
+            # rejected exactly when the parent is already below the child
+            creates_cycle = _reaches(child, parent)
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert (graph.add_group(parent, child) is not creates_cycle)
+        elif operation < 0.6:
+            graph.remove_group(parent, child)
+        elif operation < 0.85:
+            graph.add_user(parent, rng.choice(users))
+        elif parent.users:
+            graph.remove_user(parent, rng.choice(sorted(parent.users)))
+    for group in groups:
+        assert (graph.users_in_group(group) == group.get_all_users())
+        for user in users:
+            assert (graph.is_user_in_group(user, group) == is_user_in_group(user, group))
+    for user in users:
+        assert (graph.groups_of_user(user) == {group for group in groups if is_user_in_group(user, group)})
+
+    # existing hierarchy
+    loaded_graph = MembershipGraph.from_groups(*groups)
+    for user in users:
+        assert (loaded_graph.groups_of_user(user) == graph.groups_of_user(user))
+    x, y = Group("x"), Group("y")
+    x.add_group(y)
+    y.add_group(x)
+    assert (MembershipGraph.from_groups(x) is None)  # should print "Cycle detected!"
+
+
+def _reaches(group, target):
+    # True if `target` is below `group`, iterative traversal used to check the graph
+    visited = {group}
+    stack = [group]
+    while stack:
+        for sub_group in stack.pop().groups:
+            if sub_group is target:
+                return True
+            if sub_group not in visited:
+                visited.add(sub_group)
+                stack.append(sub_group)
+    return False
+
+
 test()
+test_membership()
+test_membership_index()
+test_membership_graph()
@@ -0,0 +1,143 @@
+"""
+Benchmarks for the block chain in problem_5. Run from inside the problem_5 directory: `python benchmark_5.py`
+"""
+
+import datetime
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from problem_5 import Block, BlockChain, CompactBlockChain, Node, PersistentBlockChain
+
+
+class ScanBlockChain(object):
+    """ Baseline: append walks from the head to the last block, search scans the chain """
+
+    def __init__(self):
+        self.head = None
+
+    def append(self, data):
+        block = Block(datetime.datetime.utcnow().strftime("%d/%m/%y %H:%M:%S"), data)
+        if self.head is None:
+            self.head = Node(block)
+            return
+        tail = self.head
+        while tail.next:
+            tail = tail.next
+        block.previous_hash = tail.value.hash
+        tail.next = Node(block)
+
+    def search(self, data):
+        node = self.head
+        while node:
+            if node.value.data == data:
+                return node
+            node = node.next
+        return None
+
+
+def measure_chain(chain_class, size, queries=1000):
+    start = time.perf_counter()
+    chain = chain_class()
+    for n in range(size):
+        chain.append("block{}".format(n))
+    append_time = time.perf_counter() - start
+
+    rng = random.Random(42)
+    keys = ["block{}".format(rng.randrange(size)) for _ in range(queries)]
+    start = time.perf_counter()
+    for key in keys:
+        assert chain.search(key) is not None
+    search_time = time.perf_counter() - start
+    return chain, size / append_time, queries / search_time
+
+
+def benchmark_scaling(sizes=(1000, 10000, 100000, 1000000), baseline_max_size=10000, deletes=1000):
+    print("\n-------Block chain scaling (ops/sec)-----------")
+    print("{:>10} {:>16} {:>16} {:>16} {:>16} {:>16}".format("blocks", "scan append", "scan search", "append",
+                                                              "search", "delete"))
+    for size in sizes:
+        scan_append = scan_search = "-"
+        if size <= baseline_max_size:
+            _, scan_append, scan_search = measure_chain(ScanBlockChain, size)
+            scan_append, scan_search = "{:,.0f}".format(scan_append), "{:,.0f}".format(scan_search)
+        chain, append, search = measure_chain(BlockChain, size)
+
+        rng = random.Random(7)
+        keys = ["block{}".format(n) for n in rng.sample(range(size), min(deletes, size))]
+        start = time.perf_counter()
+        for key in keys:
+            assert chain.delete(key)
+        delete = len(keys) / (time.perf_counter() - start)
+        print("{:>10,} {:>16} {:>16} {:>16,.0f} {:>16,.0f} {:>16,.0f}".format(size, scan_append, scan_search,
+                                                                              append, search, delete))
+
+
+def benchmark_memory(size=200000):
+    print("\n-------Block chain memory ({:,} blocks)-----------".format(size))
+    print("{:>20} {:>16} {:>16} {:>16} {:>16}".format("", "bytes/block", "append ops/s", "search ops/s",
+                                                      "iterate blocks/s"))
+    data = ["block{}".format(n) for n in range(size)]
+    for chain_class in (BlockChain, CompactBlockChain):
+        # the data strings are allocated before tracing, both chains keep a reference or a copy of them
+        tracemalloc.start()
+        chain = chain_class()
+        for item in data:
+            chain.append(item)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del chain
+
+        # speed in a separate run, tracing slows everything down
+        chain, append, search = measure_chain(chain_class, size)
+        start = time.perf_counter()
+        for block in chain:
+            block.hash
+        iterate = size / (time.perf_counter() - start)
+        print("{:>20} {:>16,.0f} {:>16,.0f} {:>16,.0f} {:>16,.0f}".format(chain_class.__name__, memory / size, append,
+                                                                          search, iterate))
+
+
+def benchmark_persistence(size=200000, sync_settings=((1, 0), (64, 0.05), (1024, 1.0))):
+    print("\n-------Persistent block chain ({:,} blocks)-----------".format(size))
+    print("{:>26} {:>16}".format("group commit", "append ops/s"))
+    data = ["block{}".format(n) for n in range(size)]
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "chain.log")
+    try:
+        for sync_every, sync_interval in sync_settings:
+            # every fsync blocks on the disk, only a slice of the blocks is written with one fsync per record
+            count = size if sync_every > 1 else size // 100
+            start = time.perf_counter()
+            with PersistentBlockChain.open(path, sync_every, sync_interval) as chain:
+                for item in data[:count]:
+                    chain.append(item)
+            append = count / (time.perf_counter() - start)
+            os.remove(path)
+            print("{:>26} {:>16,.0f}".format("{} blocks / {}s".format(sync_every, sync_interval), append))
+
+        with PersistentBlockChain.open(path) as chain:
+            for item in data:
+                chain.append(item)
+        start = time.perf_counter()
+        with PersistentBlockChain.open(path) as chain:
+            assert len(chain) == size
+        reopen = time.perf_counter() - start
+        start = time.perf_counter()
+        chain = BlockChain()
+        for item in data:
+            chain.append(item)
+        rebuild = time.perf_counter() - start
+        print("reopen log {:.3f}s ({:.1f} MB), rebuild BlockChain by hashing again {:.3f}s".format(
+            reopen, os.path.getsize(path) / 1024 / 1024, rebuild))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+
+
+benchmark_scaling()
+benchmark_memory()
+benchmark_persistence()
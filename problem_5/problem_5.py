@@ -7,8 +7,16 @@ when the block was created, and text strings as the data.
 Use your knowledge of linked lists and hashing to create a blockchain implementation.
 """
 
+from array import array
 import hashlib
 import datetime
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
 
 
 class Block:
@@ -32,6 +40,10 @@ class Node:
     def __init__(self, value):
         self.value = value
         self.next = None
+        self.prev = None
+        # next node with the same data (and so the same hash), and on the first one of them the last one
+        self.next_same = None
+        self.last_same = self
 
     def __repr__(self):
         return str(self.value)
@@ -40,7 +52,11 @@ class Node:
 class BlockChain:
     def __init__(self):
         self.head = None
+        self.tail = None
         self.size = 0
+        # first node of every block hash and data, search and delete don't have to scan the chain
+        self._by_hash = {}
+        self._by_data = {}
 
     def append(self, data):
         if data is None:
@@ -49,20 +65,25 @@ class BlockChain:
 
         time = datetime.datetime.utcnow().strftime("%d/%m/%y %H:%M:%S")
         block = Block(time, data)
+        node = Node(block)
 
         if self.head is None:
-            self.head = Node(block)
-            self.size += 1
-            return
-
-        tail = self.head
-        while tail.next:
-            tail = tail.next
-
-        block.previous_hash = tail.value.hash
-        tail.next = Node(block)
+            self.head = node
+        else:
+            block.previous_hash = self.tail.value.hash
+            self.tail.next = node
+            node.prev = self.tail
+        self.tail = node
         self.size += 1
 
+        first = self._by_data.get(data)
+        if first is None:
+            self._by_data[data] = node
+            self._by_hash[block.hash] = node
+        else:
+            first.last_same.next_same = node
+            first.last_same = node
+
     def __len__(self):
         return self.size
 
@@ -70,16 +91,15 @@ class BlockChain:
         return len(self) == 0
 
     def search(self, data):
+        """ Return the first node with the requested data, None if there is none. """
         if data is None:
             return None
 
-        """ Search the linked list for a node with the requested value and return the node. """
-        node = self.head
-        while node:
-            if node.value.data == data:
-                return node
-            node = node.next
-        return None
+        return self._by_data.get(data)
+
+    def search_hash(self, block_hash):
+        """ Return the first node whose block has the requested hash, None if there is none. """
+        return self._by_hash.get(block_hash)
 
     def delete(self, data):
         """ Remove first occurrence of value. """
@@ -87,26 +107,33 @@ class BlockChain:
         if data is None:
             return False
 
-        if self.is_empty():
+        node = self._by_data.get(data)
+        if node is None:
+            # Node not found
             return False
 
-        if self.head.value.data == data:
-            self.head = self.head.next
-            self.size -= 1
-            return True
-
-        node = self.head
-        while node.next and node.next.value.data != data:
-            node = node.next
-
-        if node.next:
-            node.next = node.next.next
-            node.next.value.previous_hash = node.value.hash
-            self.size -= 1
-            return True
-
-        # Node not found
-        return False
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+            if node.prev is not None:
+                node.next.value.previous_hash = node.prev.value.hash
+        self.size -= 1
+
+        # the next node with the same data becomes the first one
+        next_same = node.next_same
+        if next_same is None:
+            del self._by_data[data]
+            del self._by_hash[node.value.hash]
+        else:
+            next_same.last_same = node.last_same
+            self._by_data[data] = next_same
+            self._by_hash[node.value.hash] = next_same
+        return True
 
     def to_list(self):
         return [b for b in self]
@@ -121,6 +148,418 @@ class BlockChain:
         return str([b for b in self])
 
 
+class CompactBlock(object):
+    """
+    Lazy view of a block of a `CompactBlockChain` with the same attributes as `Block`. It only holds the chain and the
+    slot of the block, attributes are read from the chain columns when they are accessed.
+    """
+    __slots__ = ("_chain", "_slot")
+
+    def __init__(self, chain, slot):
+        self._chain = chain
+        self._slot = slot
+
+    @property
+    def data(self):
+        chain = self._chain
+        offset = chain._data_offsets[self._slot]
+        return chain._data[offset:offset + chain._data_lengths[self._slot]].decode('utf-8')
+
+    @property
+    def timestamp(self):
+        timestamp = datetime.datetime.fromtimestamp(self._chain._timestamps[self._slot], datetime.timezone.utc)
+        return timestamp.strftime("%d/%m/%y %H:%M:%S")
+
+    @property
+    def hash(self):
+        return self._chain._digest(self._slot).hex()
+
+    @property
+    def previous_hash(self):
+        chain = self._chain
+        previous_slot = chain._prev[self._slot]
+        if previous_slot != chain._NIL:
+            return chain._digest(previous_slot).hex()
+        return chain._head_previous
+
+    def __repr__(self):
+        return str(f"Block({self.data, self.timestamp, self.hash}, prev_hash={self.previous_hash})")
+
+
+class CompactBlockChain(object):
+    """
+    Memory compact block chain with the same operations as `BlockChain`.
+
+    Instead of a `Block`, a `Node`, a 64 characters hex hash and a formatted timestamp string per block, blocks are
+    stored in columns: raw 32 bytes SHA-256 digests one after the other in a `bytearray`, epoch timestamps and chain
+    links (slot numbers) in `array`s, and the data of all blocks encoded in one shared `bytearray` with an offset and
+    a length per block. The previous hash of a block is not stored, it is the digest of the previous block in the chain
+    (or `_head_previous` for the first block). Blocks are only materialized as `CompactBlock` views when iterated or
+    returned by a search.
+
+    Search by data or hash uses an open addressing hash table of slot numbers (linear probing, backward shift deletion)
+    keyed by the digest, rather than dicts which would hold one key object per block. Like `BlockChain`, it points to
+    the first block of every digest and blocks with the same data are linked in `_next_same`.
+    Deleted blocks are unlinked, their slot and data bytes are not reused.
+    """
+    _NIL = -1
+    _DIGEST_SIZE = 32
+
+    def __init__(self):
+        self._digests = bytearray()
+        self._timestamps = array('q')
+        self._data = bytearray()
+        self._data_offsets = array('q')
+        self._data_lengths = array('q')
+        self._prev = array('i')
+        self._next = array('i')
+        # next block with the same data, and on the first one of them the last one
+        self._next_same = array('i')
+        self._last_same = array('i')
+        # index table is kept at most half full so that probe sequences stay short
+        self._index = array('i', [self._NIL]) * 8
+        self._mask = 7
+        self._index_size = 0
+        self._head = self._NIL
+        self._tail = self._NIL
+        # previous hash of the first block: 0 like `Block`, or the hash of a deleted first block
+        self._head_previous = 0
+        self.size = 0
+
+    def _digest(self, slot):
+        return self._digests[slot * self._DIGEST_SIZE:(slot + 1) * self._DIGEST_SIZE]
+
+    def _home(self, digest):
+        # SHA-256 digests are uniformly distributed, their first bytes are a good hash
+        return int.from_bytes(digest[:8], "little") & self._mask
+
+    def _find(self, digest):
+        # returns (position in index table, slot), slot is _NIL and position is the first empty position if not found
+        position = self._home(digest)
+        while True:
+            slot = self._index[position]
+            if slot == self._NIL or self._digest(slot) == digest:
+                return position, slot
+            position = (position + 1) & self._mask
+
+    def _delete_position(self, position):
+        # backward shift deletion: move following entries of the probe sequence into the hole
+        index, mask = self._index, self._mask
+        index[position] = self._NIL
+        next_position = (position + 1) & mask
+        while index[next_position] != self._NIL:
+            slot = index[next_position]
+            home = self._home(self._digest(slot))
+            # the entry can fill the hole only if the hole lies between its home position and its current position
+            if (next_position - home) & mask >= (next_position - position) & mask:
+                index[position] = slot
+                index[next_position] = self._NIL
+                position = next_position
+            next_position = (next_position + 1) & mask
+
+    def _grow_index(self):
+        # double the table and move the entries, their digests are all different so there is nothing to compare
+        old_index = self._index
+        index = self._index = array('i', [self._NIL]) * (2 * len(old_index))
+        mask = self._mask = len(index) - 1
+        for slot in old_index:
+            if slot != self._NIL:
+                position = self._home(self._digest(slot))
+                while index[position] != self._NIL:
+                    position = (position + 1) & mask
+                index[position] = slot
+
+    def append(self, data):
+        if data is None:
+            print("Can not add block without any data!")
+            return
+
+        encoded = data.encode('utf-8')
+        self._append(encoded, hashlib.sha256(encoded).digest(), int(time.time()))
+
+    def _append(self, encoded, digest, timestamp):
+        slot = len(self._timestamps)
+        self._digests += digest
+        self._timestamps.append(timestamp)
+        self._data_offsets.append(len(self._data))
+        self._data_lengths.append(len(encoded))
+        self._data += encoded
+        self._next.append(self._NIL)
+        self._prev.append(self._tail)
+        self._next_same.append(self._NIL)
+        self._last_same.append(slot)
+
+        if self._head == self._NIL:
+            self._head = slot
+            self._head_previous = 0
+        else:
+            self._next[self._tail] = slot
+        self._tail = slot
+        self.size += 1
+
+        position, first = self._find(digest)
+        if first != self._NIL:
+            self._next_same[self._last_same[first]] = slot
+            self._last_same[first] = slot
+            return
+        if 2 * (self._index_size + 1) > len(self._index):
+            self._grow_index()
+            position, _ = self._find(digest)
+        self._index[position] = slot
+        self._index_size += 1
+
+    def __len__(self):
+        return self.size
+
+    def is_empty(self):
+        return len(self) == 0
+
+    def search(self, data):
+        """ Return the first block with the requested data, None if there is none. """
+        if data is None:
+            return None
+
+        _, slot = self._find(hashlib.sha256(data.encode('utf-8')).digest())
+        return None if slot == self._NIL else CompactBlock(self, slot)
+
+    def search_hash(self, block_hash):
+        """ Return the first block with the requested hash, None if there is none. """
+        try:
+            digest = bytes.fromhex(block_hash)
+        except (TypeError, ValueError):
+            return None
+        _, slot = self._find(digest)
+        return None if slot == self._NIL else CompactBlock(self, slot)
+
+    def delete(self, data):
+        """ Remove first occurrence of value. """
+
+        if data is None:
+            return False
+
+        return self._delete(hashlib.sha256(data.encode('utf-8')).digest())
+
+    def _delete(self, digest):
+        position, slot = self._find(digest)
+        if slot == self._NIL:
+            # Block not found
+            return False
+
+        prev_slot, next_slot = self._prev[slot], self._next[slot]
+        if prev_slot == self._NIL:
+            # like `BlockChain`, the new first block keeps the hash of the deleted one as previous hash
+            self._head = next_slot
+            self._head_previous = digest.hex()
+        else:
+            self._next[prev_slot] = next_slot
+        if next_slot == self._NIL:
+            self._tail = prev_slot
+        else:
+            self._prev[next_slot] = prev_slot
+        self.size -= 1
+
+        # the next block with the same data becomes the first one
+        next_same = self._next_same[slot]
+        if next_same == self._NIL:
+            self._delete_position(position)
+            self._index_size -= 1
+        else:
+            self._last_same[next_same] = self._last_same[slot]
+            self._index[position] = next_same
+        return True
+
+    def to_list(self):
+        return [b for b in self]
+
+    def __iter__(self):
+        slot = self._head
+        while slot != self._NIL:
+            yield CompactBlock(self, slot)
+            slot = self._next[slot]
+
+    def __repr__(self):
+        return str([b for b in self])
+
+
+# log file: header, then one record per append or delete. A record is the crc32 of the rest of the record, its
+# fields and the utf-8 data of the block (empty for deletes)
+_LOG_HEADER = struct.Struct("<4sB")
+_LOG_MAGIC = b"BLKL"
+_LOG_VERSION = 1
+_RECORD_CRC = struct.Struct("<I")
+_RECORD_FIELDS = struct.Struct("<IBq32s")  # data length, kind, timestamp, digest
+_APPEND_RECORD = 0
+_DELETE_RECORD = 1
+
+
+class PersistentBlockChain(CompactBlockChain):
+    """
+    `CompactBlockChain` saved in an append-only log file. Every append and delete is written as a length prefixed
+    record with the block digest, so reopening the file rebuilds the chain in one sequential pass over the memory
+    mapped file without hashing the data again.
+
+    Every record is flushed to the operating system when it is written, so a crash of the process loses nothing.
+    fsyncs are group committed: every `sync_every` records, and by a timer at most `sync_interval` seconds after the
+    first record that isn't synced yet, so an operating system crash or a power loss can lose at most that window.
+    A record cut by a crash at the end of the log is dropped when reopening, a corrupted record followed by other data
+    makes the log invalid and nothing is truncated.
+    Use `PersistentBlockChain.open(path)` to create or reopen a chain, and `close` it (or use it in a `with` block).
+    """
+
+    def __init__(self, file, sync_every=64, sync_interval=0.05):
+        super().__init__()
+        self._file = file
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._pending = 0
+        # timer of the next fsync when records are waiting for one, the lock serializes fsyncs and the timer
+        self._sync_timer = None
+        self._sync_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path, sync_every=64, sync_interval=0.05):
+        """
+        Create the log file at path, or reopen it and rebuild the chain from its records.
+
+        Args:
+            path: path of the log file
+            sync_every: number of records written between two fsyncs
+            sync_interval: maximum time in seconds between a record and its fsync
+        Returns:
+            the chain, None if the settings are invalid, the file is not a block chain log or it is corrupted
+        """
+        if sync_every < 1 or sync_interval < 0:
+            print("Invalid sync settings!")
+            return None
+
+        # appends always go to the end of the file, reading is needed for mmap
+        file = open(path, "a+b")
+        chain = cls(file, sync_every, sync_interval)
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            file.write(_LOG_HEADER.pack(_LOG_MAGIC, _LOG_VERSION))
+            chain.sync()
+            return chain
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as log:
+            if size < _LOG_HEADER.size or _LOG_HEADER.unpack_from(log) != (_LOG_MAGIC, _LOG_VERSION):
+                print("Invalid log file!")
+                file.close()
+                return None
+            end = chain._replay(log)
+        if end is None:
+            print("Invalid Data!")
+            file.close()
+            return None
+        if end < size:
+            # drop a record cut by a crash so that new records follow the last valid one
+            file.truncate(end)
+            chain.sync()
+        return chain
+
+    def _replay(self, log):
+        """
+        Apply the records in order
+        Returns:
+            int: end of the last valid record, None if a record is corrupted and it isn't the end of the log
+        """
+        offset, size = _LOG_HEADER.size, len(log)
+        header_size = _RECORD_CRC.size + _RECORD_FIELDS.size
+        while offset < size:
+            if offset + header_size > size:
+                # header cut by a crash
+                return offset
+            crc, = _RECORD_CRC.unpack_from(log, offset)
+            length, kind, timestamp, digest = _RECORD_FIELDS.unpack_from(log, offset + _RECORD_CRC.size)
+            end = offset + header_size + length
+            if end > size or zlib.crc32(log[offset + _RECORD_CRC.size:end]) != crc:
+                # a record cut by a crash is the last one, possibly followed by zeros the file system allocated.
+                # Anything else is corruption, the records after it must not be lost by truncating the log
+                if end >= size or log[offset:].count(0) == size - offset:
+                    return offset
+                return None
+            if kind == _APPEND_RECORD:
+                self._append(log[offset + header_size:end], digest, timestamp)
+            elif kind == _DELETE_RECORD:
+                self._delete(digest)
+            else:
+                return None
+            offset = end
+        return offset
+
+    def _write_record(self, kind, timestamp, digest, encoded=b""):
+        fields = _RECORD_FIELDS.pack(len(encoded), kind, timestamp, digest)
+        self._file.write(_RECORD_CRC.pack(zlib.crc32(encoded, zlib.crc32(fields))))
+        self._file.write(fields)
+        self._file.write(encoded)
+        # the record reaches the operating system right away, only fsyncs are batched
+        self._file.flush()
+        with self._sync_lock:
+            self._pending += 1
+            if self._pending < self.sync_every:
+                if self._sync_timer is None:
+                    self._sync_timer = threading.Timer(self.sync_interval, self._sync_pending)
+                    self._sync_timer.daemon = True
+                    self._sync_timer.start()
+                return
+        self.sync()
+
+    def append(self, data):
+        if data is None:
+            print("Can not add block without any data!")
+            return
+
+        encoded = data.encode('utf-8')
+        digest = hashlib.sha256(encoded).digest()
+        timestamp = int(time.time())
+        # the log is written first, the chain in memory is never ahead of it
+        self._write_record(_APPEND_RECORD, timestamp, digest, encoded)
+        self._append(encoded, digest, timestamp)
+
+    def delete(self, data):
+        """ Remove first occurrence of value. """
+
+        if data is None:
+            return False
+
+        digest = hashlib.sha256(data.encode('utf-8')).digest()
+        if self._find(digest)[1] == self._NIL:
+            # Block not found
+            return False
+        self._write_record(_DELETE_RECORD, 0, digest)
+        return self._delete(digest)
+
+    def _sync_pending(self):
+        # runs in the timer thread, records are already flushed so only the fsync is left
+        with self._sync_lock:
+            self._sync_timer = None
+            if self._pending and not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._pending = 0
+
+    def sync(self):
+        """ Write the buffered records and fsync the log file. """
+        with self._sync_lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            with self._sync_lock:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 def test_hash_equality(output):
     # check if next block's previous_hash is same as first block's hash
     prev_hash = None
@@ -181,4 +620,154 @@ def test():
     empty_block_chain = BlockChain()
     print(empty_block_chain)  # should print []
 
+
+def test_indexes():
+    block_chain = BlockChain()
+    for data in ("data1", "data2", "data1", "data3", "data1"):
+        block_chain.append(data)
+
+    # search by data and by hash find the first occurrence
+    first = block_chain.search("data1")
+    assert (first is block_chain.head)
+    assert (block_chain.search_hash(first.value.hash) is first)
+    assert (block_chain.search_hash("unknown hash") is None)
+
+    # delete removes the first occurrence, the next one is found after that
+    assert (block_chain.delete("data1") is True)
+    assert ([b.data for b in block_chain] == ["data2", "data1", "data3", "data1"])
+    assert (block_chain.search("data1") is block_chain.head.next)
+    assert (block_chain.delete("data1") is True)
+    assert (block_chain.search("data1") is block_chain.tail)
+    test_hash_equality(block_chain.to_list())
+
+    # delete the last block, append keeps linking to the new last block
+    assert (block_chain.delete("data1") is True)
+    assert (block_chain.search("data1") is None)
+    assert (block_chain.tail.value.data == "data3")
+    block_chain.append("data4")
+    assert ([b.data for b in block_chain] == ["data2", "data3", "data4"])
+    test_hash_equality(block_chain.to_list())
+    assert (block_chain.delete("data5") is False)
+
+    # delete everything then reuse the chain
+    for data in ("data2", "data3", "data4"):
+        assert (block_chain.delete(data) is True)
+    assert (block_chain.is_empty() and block_chain.head is None and block_chain.tail is None)
+    block_chain.append("data6")
+    assert (block_chain.search("data6") is block_chain.head is block_chain.tail)
+
+    # long chain, no walk to the tail on append
+    block_chain = BlockChain()
+    for n in range(10000):
+        block_chain.append("block{}".format(n))
+    assert (len(block_chain) == 10000)
+    assert (block_chain.search("block9999") is block_chain.tail)
+    test_hash_equality(block_chain.to_list())
+
+
+def test_compact_chain():
+    # same operations as BlockChain give the same blocks. Timestamps are not compared, a second boundary can fall
+    # between the appends of both chains
+    block_chain, compact_chain = BlockChain(), CompactBlockChain()
+    for data in ["data1", "data2", "data1", "data3", "données", "data1"] + ["block{}".format(n) for n in range(100)]:
+        block_chain.append(data)
+        compact_chain.append(data)
+    for data in ("data1", "block50", "data3", "block99", "data1", "missing"):
+        assert (block_chain.delete(data) == compact_chain.delete(data))
+    assert (len(compact_chain) == len(block_chain))
+    for block, compact_block in zip(block_chain, compact_chain):
+        assert ((block.data, block.hash, block.previous_hash) ==
+                (compact_block.data, compact_block.hash, compact_block.previous_hash))
+        assert (len(compact_block.timestamp) == len(block.timestamp) == len("01/01/00 00:00:00"))
+    test_hash_equality(compact_chain.to_list())
+    print(compact_chain.to_list()[:2])
+
+    # search by data and hash
+    block = compact_chain.search("data1")
+    assert (block.data == "data1")
+    assert (compact_chain.search_hash(block.hash).data == "data1")
+    assert (compact_chain.search("block50") is None)
+    assert (compact_chain.search_hash("not a hash") is None)
+    assert (compact_chain.search(None) is None)
+
+    # delete everything then reuse the chain
+    for data in [b.data for b in compact_chain]:
+        assert (compact_chain.delete(data) is True)
+    assert (compact_chain.is_empty() and compact_chain.to_list() == [])
+    compact_chain.append("data7")
+    assert (compact_chain.search("data7").previous_hash == 0)
+
+    # Edge cases
+    compact_chain.append(None)  # should print "Can not add block without any data!"
+    assert (len(compact_chain) == 1)
+    assert (compact_chain.delete(None) is False)
+
+
+def test_persistent_chain():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "chain.log")
+    try:
+        with PersistentBlockChain.open(path, sync_every=3) as chain:
+            for data in ["data1", "data2", "data1", "données", "data3"]:
+                chain.append(data)
+            assert (chain.delete("data1") is True)
+            assert (chain.delete("missing") is False)
+            blocks = [(b.data, b.timestamp, b.hash, b.previous_hash) for b in chain]
+
+        # reopening replays the log
+        with PersistentBlockChain.open(path) as chain:
+            assert ([(b.data, b.timestamp, b.hash, b.previous_hash) for b in chain] == blocks)
+            assert (chain.search("données").previous_hash == chain.search("data1").hash)
+            test_hash_equality(chain.to_list())
+            chain.append("data4")
+        size = os.path.getsize(path)
+
+        # a record cut by a crash is dropped and the next records follow the last valid one
+        with open(path, "r+b") as file:
+            file.truncate(size - 2)
+        with PersistentBlockChain.open(path) as chain:
+            assert ([b.data for b in chain] == ["data2", "data1", "données", "data3"])
+            chain.append("data5")
+        with PersistentBlockChain.open(path) as chain:
+            assert ([b.data for b in chain] == ["data2", "data1", "données", "data3", "data5"])
+        size = os.path.getsize(path)
+
+        # zeros allocated after the last record are dropped too
+        with open(path, "ab") as file:
+            file.write(bytes(100))
+        with PersistentBlockChain.open(path) as chain:
+            assert (len(chain) == 5)
+        assert (os.path.getsize(path) == size)
+
+        # records are flushed when written and fsynced by the timer without more writes
+        with PersistentBlockChain.open(path, sync_every=1000, sync_interval=0.01) as chain:
+            chain.append("data6")
+            assert (os.path.getsize(path) > size)
+            time.sleep(0.2)
+            assert (chain._pending == 0)
+        size = os.path.getsize(path)
+
+        # a corrupted record followed by other records makes the log invalid, nothing is truncated
+        with open(path, "r+b") as file:
+            log = file.read()
+            file.seek(log.index(b"data2"))
+            file.write(b"DATA2")
+        assert (PersistentBlockChain.open(path) is None)  # should print "Invalid Data!"
+        assert (os.path.getsize(path) == size)
+
+        # Edge cases
+        with open(path, "wb") as file:
+            file.write(b"not a block chain log")
+        assert (PersistentBlockChain.open(path) is None)  # should print "Invalid log file!"
+        assert (PersistentBlockChain.open(path, sync_every=0) is None)  # should print "Invalid sync settings!"
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+
+
 test()
+test_indexes()
+test_compact_chain()
+test_persistent_chain()
+